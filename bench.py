@@ -0,0 +1,77 @@
+import giantbomb
+import itertools
+import json
+import timeit
+import tracemalloc
+
+game_dict = {field: 'Test {}'.format(field) for field in giantbomb.Game.__slots__}
+game_dict['platforms'] = [{'id': 94, 'name': 'PC'}, {'id': 146, 'name': 'PlayStation 4'}]
+count = 10000
+
+
+class DictGame:
+    # same attributes as Game, stored the way models did before __slots__
+    def __init__(self, data):
+        for field in giantbomb.Game.__slots__:
+            setattr(self, field, data.get(field, None))
+
+
+def measure(factory):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory(game_dict) for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return (size - len(objects) * 8) / count
+
+
+print('Memory per Game, __dict__: {:.0f} bytes'.format(measure(DictGame)))
+print('Memory per Game, __slots__: {:.0f} bytes'.format(measure(giantbomb.Game.from_dict)))
+
+
+class LegacyGame:
+    # per-field data.get calls followed by the old exception driven trim_attributes pass
+    def __init__(self, data):
+        for field in giantbomb.Game.__slots__:
+            setattr(self, field, data.get(field, None))
+        fields = self.__dict__
+        for field in fields:
+            try:
+                if len(fields[field]) == 1:
+                    setattr(self, field, fields[field][0])
+            except TypeError:
+                pass
+
+
+for name, factory in (('legacy', LegacyGame), ('table driven', giantbomb.Game.from_dict)):
+    seconds = min(timeit.repeat(lambda: factory(game_dict), number=count, repeat=5))
+    print('Game.from_dict, {}: {:.0f} objects/s'.format(name, count / seconds))
+
+for name, lazy in (('eager', False), ('lazy', True)):
+    seconds = min(timeit.repeat(lambda: giantbomb.Game.from_dict(game_dict, lazy).name, number=count, repeat=5))
+    print('Game.from_dict + name, {}: {:.0f} objects/s'.format(name, count / seconds))
+
+GameSummary = giantbomb.view(giantbomb.Game, ['id', 'name', 'platforms'], 'GameSummary')
+summary_dict = {key: game_dict[key] for key in GameSummary.field_list}
+
+for name, cls, data in (('Game', giantbomb.Game, game_dict), ('GameSummary', GameSummary, summary_dict)):
+    seconds = min(timeit.repeat(lambda: cls.from_dict(data), number=count, repeat=5))
+    print('{}.from_dict: {:.0f} objects/s'.format(name, count / seconds))
+
+try:
+    import config
+except ImportError:
+    config = None
+
+if config is not None:
+    # payload size needs the real API, game ids are taken from the first page of games
+    api = giantbomb.Api(config.api_key, 'bench/0.1')
+    # islice stops iter_games after its first page instead of paging through the whole catalogue
+    guids = [game.api_detail_url.rstrip('/').rsplit('/', 1)[-1]
+             for game in itertools.islice(api.iter_games(field_list=['api_detail_url'], limit=5), 5)]
+    for name, field_list in (('Game', []), ('GameSummary', GameSummary.field_list)):
+        size = sum(len(json.dumps(api.fetch(api.base_url + 'game/{}'.format(guid),
+                                            params={'field_list': ','.join(field_list)})))
+                   for guid in guids)
+        print('{} payload: {:.0f} bytes/game'.format(name, size / len(guids)))
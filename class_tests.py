@@ -1,4 +1,12 @@
 import giantbomb
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+
+# removed when the interpreter exits, also when an assertion fails
+scratch = tempfile.TemporaryDirectory()
 
 accessory_dict = {
         'api_detail_url': 'www.test.com',
@@ -23,3 +31,210 @@ assert acc.id == accessory_dict['id']
 assert acc.image == accessory_dict['image']
 assert acc.name == accessory_dict['name']
 assert acc.site_detail_url == accessory_dict['site_detail_url']
+
+limiter = giantbomb.RateLimiter(rate=10, burst=2)
+
+assert limiter.try_acquire() == 0
+assert limiter.try_acquire() == 0
+assert 0 < limiter.try_acquire() <= 0.1
+limiter.acquire()
+assert limiter.try_acquire() > 0
+assert giantbomb.RateLimiter.from_delay(0).try_acquire() == 0
+
+cache = giantbomb.MemoryCache(max_entries=2)
+cache.set('a', 1)
+cache.set('b', 2)
+assert cache.get('a') == 1
+cache.set('c', 3)
+
+assert cache.get('b') is None
+assert cache.get('a') == 1
+assert cache.get('c') == 3
+assert (cache.hits, cache.misses) == (3, 1)
+assert giantbomb.Api.cache_key('game/1', {'api_key': 'x', 'format': 'json', 'b': '2', 'a': '1'}) == 'game/1?a=1&b=2'
+
+cache_path = os.path.join(scratch.name, 'cache.sqlite')
+cache = giantbomb.SqliteCache(cache_path, resource_ttls={'game': 0}, max_entries=2)
+cache.set('game/1', {'id': 1}, 'game')
+cache.set('platform/1', {'id': 1}, 'platform')
+cache.set('platform/2', {'id': 2}, 'platform')
+cache.set('platform/3', {'id': 3}, 'platform')
+
+assert cache.get('game/1') is None
+assert cache.get('platform/1') is None
+assert cache.get('platform/3') == {'id': 3}
+assert len(cache) == 2
+
+# other threads, a restarted program and other processes all see the same cache file
+seen = []
+reader = threading.Thread(target=lambda: seen.append(cache.get('platform/3')))
+reader.start()
+reader.join()
+assert seen == [{'id': 3}]
+cache.close()
+
+reopened = giantbomb.SqliteCache(cache_path)
+assert reopened.get('platform/3') == {'id': 3}
+
+
+def read_cache(path, key, results):
+    results.put(giantbomb.SqliteCache(path).get(key))
+
+
+fork = multiprocessing.get_context('fork')
+results = fork.Queue()
+process = fork.Process(target=read_cache, args=(cache_path, 'platform/3', results))
+process.start()
+assert results.get(timeout=10) == {'id': 3}
+process.join()
+
+try:
+    giantbomb.SqliteCache(':memory:')
+    assert False
+except giantbomb.ApiError:
+    pass
+
+cache = giantbomb.MemoryCache(ttl=0)
+cache.set('game/1', {'id': 1})
+
+assert cache.get('game/1') is None
+assert cache.get_stale('game/1') == {'id': 1}
+cache.ttl = 60
+cache.touch('game/1')
+assert cache.get('game/1') == {'id': 1}
+assert cache.revalidated == 1
+
+game = giantbomb.Game.from_dict({'id': 1, 'name': 'Test name', 'platforms': [{'id': 94}]}, lazy=True)
+
+assert game.name == 'Test name'
+assert game.platforms == [giantbomb.Reference('platform', 94)]
+assert game.description is None
+
+game = giantbomb.Game.from_dict({'developers': [{'id': 1,
+                                                  'api_detail_url': 'http://www.giantbomb.com/api/company/3010-1/'},
+                                                {'id': 2, 'name': 'Test name'}]})
+
+assert [developer.resource for developer in game.developers] == ['company', 'company']
+assert game.developers[0].guid == '3010-1'
+assert game.developers[1].guid == 2
+assert game.developers[1].name == 'Test name'
+
+identity_map = giantbomb.IdentityMap()
+platform = identity_map.model(giantbomb.Platform, {'id': 94, 'name': 'PC'})
+
+assert identity_map.model(giantbomb.Platform, {'id': 94, 'deck': 'Test deck'}) is platform
+assert platform.name == 'PC'
+assert platform.deck == 'Test deck'
+assert identity_map.reference('platform', {'id': 94}) is identity_map.reference('platform', {'id': 94})
+
+# keywords from older versions of the constructors still set their field
+company = giantbomb.Company(id_=1, publisher_releases=[{'id': 5, 'name': 'Test release'}])
+assert company.id == 1
+assert company.published_releases == [giantbomb.Reference('release', 5)]
+
+# a sparse reference seen first is filled in by a later, richer payload instead of shadowing it
+interning = giantbomb.Api('', '', identity_map=True)
+sparse = interning.build(giantbomb.Game, {'id': 1, 'platforms': [{'id': 145}]})
+rich = interning.build(giantbomb.Game, {'id': 2, 'platforms': [{
+    'id': 145, 'name': 'PC', 'api_detail_url': 'http://www.giantbomb.com/api/platform/3045-145/'}]})
+
+assert sparse.platforms[0] is rich.platforms[0]
+assert sparse.platforms[0].name == 'PC'
+assert sparse.platforms[0].guid == '3045-145'
+assert interning.build(giantbomb.Game, {'id': 3, 'platforms': [{'id': 145}]}).platforms[0].name == 'PC'
+
+GameSummary = giantbomb.view(giantbomb.Game, ['id', 'name', 'platforms'], 'GameSummary')
+summary = GameSummary.from_dict({'id': 1, 'name': 'Test name', 'platforms': [{'id': 94}], 'deck': 'Test deck'})
+
+assert GameSummary.field_list == ['id', 'name', 'platforms']
+assert GameSummary.resource == 'game'
+assert summary.name == 'Test name'
+assert summary.platforms == [giantbomb.Reference('platform', 94)]
+assert not hasattr(summary, 'deck')
+
+metrics = giantbomb.Metrics()
+event = giantbomb.RequestEvent('http://www.giantbomb.com/api/game/3030-1', 'game/{id}')
+event.network_time = 0.2
+event.bytes = 100
+metrics.record(event)
+snapshot = metrics.snapshot()['game/{id}']
+
+assert giantbomb.Api('', '').url_template('http://www.giantbomb.com/api/game/3030-1/') == 'game/{id}/'
+assert snapshot['requests'] == 1
+assert snapshot['bytes'] == 100
+assert snapshot['network_time']['count'] == 1
+assert dict(snapshot['network_time']['buckets'])[0.25] == 1
+assert dict(snapshot['network_time']['buckets'])[0.1] == 0
+
+# a hook that raises is logged, the response still comes back and the other hooks still run
+logging.getLogger('giantbomb').disabled = True
+seen = []
+hooked = giantbomb.Api('', '', cache=giantbomb.MemoryCache())
+hooked.cache.set(giantbomb.Api.cache_key(hooked.base_url + 'game/3030-1', {}), {'status_code': 1, 'results': {}})
+hooked.add_hook(lambda event: 1 / 0)
+hooked.add_hook(seen.append)
+
+assert hooked.get(hooked.base_url + 'game/3030-1') == {'status_code': 1, 'results': {}}
+assert seen[0].cache == 'hit'
+assert hooked.metrics.snapshot()['game/{id}']['cache_hit'] == 1
+
+limiter = giantbomb.AdaptiveRateLimiter(rate=4, min_rate=1, increase=0.5)
+limiter.penalize()
+assert limiter.rate == 2
+limiter.penalize()
+limiter.penalize()
+assert limiter.rate == 1
+limiter.reward()
+assert limiter.rate == 1.5
+assert 0.5 <= giantbomb.RateLimiter.backoff(0) <= 1
+assert 4 <= giantbomb.RateLimiter.backoff(3) <= 8
+
+rate_path = os.path.join(scratch.name, 'rate')
+first = giantbomb.FileRateLimiter(rate_path, rate=10, burst=2)
+second = giantbomb.FileRateLimiter(rate_path, rate=10, burst=2)
+
+assert first.try_acquire() == 0
+assert second.try_acquire() == 0
+assert 0 < first.try_acquire() <= 0.1
+
+
+class RecordingFileRateLimiter(giantbomb.FileRateLimiter):
+    # reads the grant time back from the shared state while holding a second lock file, so
+    # no other process can be granted a token in between and process scheduling doesn't blur it
+    def __init__(self, path, grants, rate=1.0, burst=1):
+        super().__init__(path, rate, burst)
+        self.grants = grants
+
+    def try_acquire(self):
+        fd = os.open(self.path + '.record', os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            giantbomb.fcntl.flock(fd, giantbomb.fcntl.LOCK_EX)
+            wait = super().try_acquire()
+            if wait <= 0:
+                with open(self.path) as state:
+                    self.grants.put(float(state.read().split()[1]))
+            return wait
+        finally:
+            os.close(fd)
+
+
+def acquire_tokens(path, grants, count):
+    limiter = RecordingFileRateLimiter(path, grants, rate=20)
+    for _ in range(count):
+        limiter.acquire()
+
+
+# worker processes pointing at the same file draw from one budget, together they stay at its rate
+shared_path = os.path.join(scratch.name, 'shared_rate')
+grants = fork.Queue()
+processes = [fork.Process(target=acquire_tokens, args=(shared_path, grants, 5)) for _ in range(4)]
+for process in processes:
+    process.start()
+# read before joining, a process doesn't exit until what it put on the queue has been taken
+times = sorted(grants.get(timeout=10) for _ in range(20))
+for process in processes:
+    process.join()
+    assert process.exitcode == 0
+
+assert min(b - a for a, b in zip(times, times[1:])) >= 0.05 * 0.99
+assert 19 / (times[-1] - times[0]) <= 20 * 1.01
@@ -1,5 +1,48 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import json
+import logging
+import os
+import queue
+import random
 import requests
-import datetime
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlencode
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 
 class ApiError(Exception):
@@ -10,50 +53,720 @@ class ApiError(Exception):
         return str(self.error)
 
 
+class RateLimitError(ApiError):
+    # the API rejected the request for going over the velocity limit, status 107 or HTTP 420/429
+    def __init__(self, error, retry_after=None):
+        super().__init__(error)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    def __init__(self, rate=1.0, burst=1):
+        # rate is in requests per second, burst is how many requests may go out back to back
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_delay(cls, delay, burst=1):
+        return cls(1000.0 / delay if delay > 0 else None, burst)
+
+    def try_acquire(self):
+        if self.rate is None:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last_time) * self.rate)
+            self.last_time = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        wait = self.try_acquire()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.try_acquire()
+
+    def penalize(self):
+        pass
+
+    def reward(self):
+        pass
+
+    @staticmethod
+    def backoff(attempt, base=1.0, maximum=60.0):
+        # exponential backoff with jitter over the upper half of the interval
+        delay = min(maximum, base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    # cuts the rate multiplicatively whenever the API reports a velocity violation
+    # and ramps it back up additively while requests keep succeeding
+    def __init__(self, rate=1.0, burst=1, min_rate=0.05, increase=0.05, decrease=0.5):
+        super().__init__(rate, burst)
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+
+    def penalize(self):
+        with self.lock:
+            if self.rate is not None:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+
+    def reward(self):
+        with self.lock:
+            if self.rate is not None:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+class FileRateLimiter(RateLimiter):
+    # token bucket whose state lives in a small file locked with flock, every process
+    # pointing at the same path draws from one shared budget
+    def __init__(self, path, rate=1.0, burst=1):
+        if fcntl is None:
+            raise ApiError('FileRateLimiter requires a platform with fcntl')
+        super().__init__(rate, burst)
+        self.path = path
+
+    @classmethod
+    def from_delay(cls, path, delay, burst=1):
+        return cls(path, 1000.0 / delay if delay > 0 else None, burst)
+
+    def try_acquire(self):
+        if self.rate is None:
+            return 0.0
+        with self.lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                # wall clock time because it has to mean the same thing in every process
+                now = time.time()
+                try:
+                    tokens, last_time = (float(value) for value in os.read(fd, 64).split())
+                except ValueError:
+                    tokens, last_time = float(self.burst), now
+                tokens = min(self.burst, tokens + max(0.0, now - last_time) * self.rate)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, '{!r} {!r}'.format(tokens, now).encode())
+            finally:
+                os.close(fd)
+        return wait
+
+
+class AsyncRateLimiter(RateLimiter):
+    async def acquire(self):
+        wait = self.try_acquire()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self.try_acquire()
+
+
+class Scheduler:
+    # hands out the tokens of one rate limiter by priority class instead of arrival order. while several classes
+    # are queued each is served in proportion to its share (self-clocked fair queueing), a class with nothing
+    # queued leaves its share to the others
+    class Lane:
+        # the scheduler as the rate limiter of one class, e.g. Api(..., rate_limiter=scheduler.bind('background'))
+        def __init__(self, scheduler, name):
+            self.scheduler = scheduler
+            self.name = name
+
+        def acquire(self):
+            self.scheduler.acquire(self.name)
+
+        def penalize(self):
+            self.scheduler.penalize()
+
+        def reward(self):
+            self.scheduler.reward()
+
+    def __init__(self, rate_limiter, shares=None, default='interactive'):
+        self.rate_limiter = rate_limiter
+        self.shares = {'interactive': 4, 'background': 1} if shares is None else dict(shares)
+        self.check(default)
+        self.default = default
+        self.condition = threading.Condition()
+        self.queue = []
+        self.sequence = itertools.count()
+        self.virtual_time = 0.0
+        self.finish = {name: 0.0 for name in self.shares}
+        self.granted = {name: 0 for name in self.shares}
+        # a context variable rather than a thread local, so the class follows the work onto the worker and
+        # producer threads of get_many, get_batch and prefetch, which run in a copy of the caller's context
+        self.current = contextvars.ContextVar('priority', default=None)
+
+    @classmethod
+    def from_delay(cls, delay, shares=None, default='interactive'):
+        return cls(RateLimiter.from_delay(delay), shares, default)
+
+    def check(self, name):
+        if name not in self.shares:
+            raise ApiError('Unknown priority class: {}'.format(name))
+
+    def bind(self, name):
+        self.check(name)
+        return Scheduler.Lane(self, name)
+
+    @contextlib.contextmanager
+    def priority(self, name):
+        # requests made inside the block, including those it hands to worker threads, are queued under name
+        self.check(name)
+        token = self.current.set(name)
+        try:
+            yield self
+        finally:
+            self.current.reset(token)
+
+    def acquire(self, name=None):
+        name = (self.current.get() or self.default) if name is None else name
+        self.check(name)
+        with self.condition:
+            # each request moves its class's tag on by 1 / share, the smallest tag waiting goes next
+            tag = max(self.virtual_time, self.finish[name]) + 1.0 / self.shares[name]
+            self.finish[name] = tag
+            ticket = (tag, next(self.sequence))
+            heapq.heappush(self.queue, ticket)
+            self.condition.notify_all()
+            try:
+                while True:
+                    if self.queue[0] is not ticket:
+                        self.condition.wait()
+                        continue
+                    wait = self.rate_limiter.try_acquire()
+                    if wait <= 0:
+                        break
+                    self.condition.wait(wait)
+            except BaseException:
+                self.queue.remove(ticket)
+                heapq.heapify(self.queue)
+                self.condition.notify_all()
+                raise
+            heapq.heappop(self.queue)
+            self.virtual_time = tag
+            self.granted[name] += 1
+            self.condition.notify_all()
+
+    def penalize(self):
+        self.rate_limiter.penalize()
+
+    def reward(self):
+        self.rate_limiter.reward()
+
+
+class Cache:
+    # backends store raw API responses keyed by Api.cache_key and keep hit/miss counters
+    def __init__(self, ttl=3600, resource_ttls=None):
+        self.ttl = ttl
+        self.resource_ttls = {} if resource_ttls is None else resource_ttls
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def ttl_for(self, resource):
+        return self.resource_ttls.get(resource, self.ttl)
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def get_stale(self, key):
+        # returns the stored value even if it has expired, used for revalidation
+        raise NotImplementedError
+
+    def set(self, key, value, resource=None):
+        raise NotImplementedError
+
+    def touch(self, key, resource=None):
+        # marks a stale entry as fresh again without replacing its value
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(Cache):
+    def __init__(self, max_entries=1024, ttl=3600, resource_ttls=None):
+        super().__init__(ttl, resource_ttls)
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_stale(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else entry[0]
+
+    def set(self, key, value, resource=None):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl_for(resource))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def touch(self, key, resource=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries[key] = (entry[0], time.monotonic() + self.ttl_for(resource))
+                self.entries.move_to_end(key)
+                self.revalidated += 1
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SqliteCache(Cache):
+    # single file cache shared between processes, WAL mode lets readers run alongside a writer.
+    # expired rows are kept around for revalidation until max_entries pushes them out
+    def __init__(self, path, ttl=3600, resource_ttls=None, max_entries=None, timeout=30):
+        # every thread opens its own connection, so an in memory database would be a separate empty cache per thread
+        if path == ':memory:' or str(path).startswith('file::memory:'):
+            raise ApiError('SqliteCache needs a file path, use MemoryCache for an in memory cache')
+        super().__init__(ttl, resource_ttls)
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.local = threading.local()
+        self.connection()
+
+    def connection(self):
+        # sqlite connections can't be shared between threads. the schema is made sure of on every new connection,
+        # the file may have been created by another thread or process, or deleted since
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            with conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('CREATE TABLE IF NOT EXISTS responses ('
+                             'key TEXT PRIMARY KEY, resource TEXT, value TEXT, fetched_at REAL, expires_at REAL)')
+                conn.execute('CREATE INDEX IF NOT EXISTS responses_fetched_at ON responses (fetched_at)')
+            self.local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self.connection().execute('SELECT value FROM responses WHERE key = ? AND expires_at > ?',
+                                        (key, time.time())).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def get_stale(self, key):
+        row = self.connection().execute('SELECT value FROM responses WHERE key = ?', (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key, value, resource=None):
+        now = time.time()
+        with self.connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                         (key, resource, json.dumps(value), now, now + self.ttl_for(resource)))
+            if self.max_entries is not None:
+                conn.execute('DELETE FROM responses WHERE key IN '
+                             '(SELECT key FROM responses ORDER BY fetched_at DESC, rowid DESC LIMIT -1 OFFSET ?)',
+                             (self.max_entries,))
+
+    def touch(self, key, resource=None):
+        now = time.time()
+        with self.connection() as conn:
+            updated = conn.execute('UPDATE responses SET fetched_at = ?, expires_at = ? WHERE key = ?',
+                                   (now, now + self.ttl_for(resource), key)).rowcount
+        self.revalidated += updated
+
+    def delete(self, key):
+        with self.connection() as conn:
+            conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+    def clear(self):
+        with self.connection() as conn:
+            conn.execute('DELETE FROM responses')
+
+    def close(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def __len__(self):
+        return self.connection().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+class RequestEvent:
+    # what happened during one Api.get call, passed to hooks and recorded by Metrics.
+    # times are in seconds, cache is 'hit', 'miss', 'revalidated' or None when no cache is configured.
+    # coalesced is set when the response was shared from an identical request another thread already had in flight
+    __slots__ = ('url', 'template', 'cache', 'wait_time', 'network_time', 'decode_time', 'bytes', 'status', 'retries',
+                 'error', 'coalesced')
+
+    def __init__(self, url, template=None):
+        self.url = url
+        self.template = template
+        self.cache = None
+        self.wait_time = 0.0
+        self.network_time = 0.0
+        self.decode_time = 0.0
+        self.bytes = 0
+        self.status = None
+        self.retries = 0
+        self.error = None
+        self.coalesced = False
+
+    @property
+    def total_time(self):
+        return self.wait_time + self.network_time + self.decode_time
+
+    def __repr__(self):
+        return '{} {{{} {:.3f}s}}'.format(self.template or self.url, self.status, self.total_time)
+
+
+class Histogram:
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Metrics:
+    # aggregate counters and latency histograms per URL template, e.g. game/{id}
+    stages = ('wait', 'network', 'decode', 'total')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def increment(self, name, template, value=1):
+        self.counters[(name, template)] = self.counters.get((name, template), 0) + value
+
+    def record(self, event):
+        with self.lock:
+            template = event.template
+            self.increment('requests', template)
+            self.increment('bytes', template, event.bytes)
+            self.increment('retries', template, event.retries)
+            if event.cache is not None:
+                self.increment('cache_{}'.format(event.cache), template)
+            if event.coalesced:
+                self.increment('coalesced', template)
+            if event.error is not None:
+                self.increment('errors', template)
+            if event.cache == 'hit':
+                return
+            for stage in self.stages:
+                histogram = self.histograms.get((stage, template))
+                if histogram is None:
+                    histogram = self.histograms[(stage, template)] = Histogram()
+                histogram.observe(getattr(event, '{}_time'.format(stage)))
+
+    def snapshot(self):
+        with self.lock:
+            result = {}
+            for (name, template), value in self.counters.items():
+                result.setdefault(template, {})[name] = value
+            for (stage, template), histogram in self.histograms.items():
+                result.setdefault(template, {})['{}_time'.format(stage)] = {'count': histogram.count,
+                                                                            'sum': histogram.sum,
+                                                                            'buckets': histogram.cumulative()}
+            return result
+
+    def prometheus(self, prefix='giantbomb'):
+        # text exposition format, ready to be served to a Prometheus scraper
+        lines = []
+        with self.lock:
+            for (name, template), value in sorted(self.counters.items()):
+                lines.append('{}_{}_total{{template="{}"}} {}'.format(prefix, name, template, value))
+            for (stage, template), histogram in sorted(self.histograms.items()):
+                metric = '{}_{}_seconds'.format(prefix, stage)
+                for bound, count in histogram.cumulative():
+                    lines.append('{}_bucket{{template="{}",le="{}"}} {}'.format(
+                        metric, template, '+Inf' if bound == float('inf') else bound, count))
+                lines.append('{}_sum{{template="{}"}} {}'.format(metric, template, histogram.sum))
+                lines.append('{}_count{{template="{}"}} {}'.format(metric, template, histogram.count))
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+class SingleFlight:
+    # concurrent callers asking for the same key share one call instead of each making their own
+    class Call:
+        __slots__ = ('done', 'result', 'error')
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn, joined=None):
+        # joined is called before waiting when the result is going to be shared from a call another thread started
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = SingleFlight.Call()
+        if not leader:
+            if joined is not None:
+                joined()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+
 class Request:
     class RequestSingleton:
         def __init__(self, delay):
-            self.last_time = None
-            self.delay = delay
-
-        @staticmethod
-        def curr_time():
-            time = datetime.datetime.now().time()
-            return (time.hour * 3600000) + (time.minute * 60000) + (time.second * 1000) + int((time.microsecond / 1000))
-
-        def get(self, url, user_agent, params=None):
-            while self.last_time is not None and (self.curr_time() - self.last_time) < self.delay:
-                pass
-            self.last_time = self.curr_time()
-            res = requests.get(url, params=params, headers={'user-agent': user_agent})
+            self._delay = delay
+            self.rate_limiter = RateLimiter.from_delay(delay)
+            self.lock = threading.Lock()
+
+        @property
+        def delay(self):
+            return self._delay
+
+        @delay.setter
+        def delay(self, delay):
+            with self.lock:
+                if delay != self._delay:
+                    self._delay = delay
+                    self.rate_limiter = RateLimiter.from_delay(delay)
+
+        def get(self, url, user_agent, params=None, rate_limiter=None, session=None, decoder=None, event=None):
+            # event, when given, is a RequestEvent that gets the timings, size and status of the request added to it
+            rate_limiter = self.rate_limiter if rate_limiter is None else rate_limiter
+            session = requests if session is None else session
+            decoder = Request.decoder if decoder is None else decoder
+            event = RequestEvent(url) if event is None else event
+            start = time.perf_counter()
+            rate_limiter.acquire()
+            waited = time.perf_counter()
+            res = session.get(url, params=params, headers={'user-agent': user_agent})
+            content = res.content
+            received = time.perf_counter()
+            event.wait_time += waited - start
+            event.network_time += received - waited
+            event.bytes += len(content)
+            event.status = res.status_code
+            Request.check_status(res.status_code, res.headers)
             try:
-                res_json = res.json()
+                res_json = decoder(content)
             except ValueError:
                 raise ApiError('URL provided returned invalid results:\nurl: {}\nparams: {}'.format(url, params))
+            finally:
+                event.decode_time += time.perf_counter() - received
             return res_json
 
+        def stream(self, url, user_agent, params=None, rate_limiter=None, session=None, summary=None, event=None):
+            # parses the response while it downloads, yielding each entry of results as soon as it is complete.
+            # the top level scalars (status_code, number_of_total_results, ...) are written into summary
+            if ijson is None:
+                raise ApiError('Streaming responses requires ijson to be installed')
+            rate_limiter = self.rate_limiter if rate_limiter is None else rate_limiter
+            session = requests if session is None else session
+            summary = {} if summary is None else summary
+            event = RequestEvent(url) if event is None else event
+            start = time.perf_counter()
+            rate_limiter.acquire()
+            waited = time.perf_counter()
+            event.wait_time += waited - start
+            res = session.get(url, params=params, headers={'user-agent': user_agent}, stream=True)
+            event.status = res.status_code
+            try:
+                Request.check_status(res.status_code, res.headers)
+                res.raw.decode_content = True
+                builder = None
+                for prefix, kind, value in ijson.parse(res.raw, use_float=True):
+                    if prefix == 'results.item' and kind == 'start_map':
+                        builder = ijson.ObjectBuilder()
+                    if builder is not None:
+                        builder.event(kind, value)
+                        if prefix == 'results.item' and kind == 'end_map':
+                            yield builder.value
+                            builder = None
+                    elif '.' not in prefix and kind in ('number', 'string', 'boolean', 'null'):
+                        summary[prefix] = value
+            except ijson.JSONError:
+                raise ApiError('URL provided returned invalid results:\nurl: {}\nparams: {}'.format(url, params))
+            finally:
+                # network and parsing are interleaved when streaming, both are counted as network time
+                event.network_time += time.perf_counter() - waited
+                event.bytes += res.raw.tell()
+                res.close()
+
     instance = None
+    instances = {}
+    lock = threading.Lock()
+
+    @staticmethod
+    def for_key(api_key):
+        # the transport registered for api_key, or None
+        with Request.lock:
+            return Request.instances.get(api_key)
+
+    @staticmethod
+    def register(api_key, delay=1000):
+        # one transport per API key, since that is what the server budgets. Apis sharing a key
+        # share its limiter, if they ask for different delays the longest one wins
+        with Request.lock:
+            instance = Request.instances.get(api_key)
+            if instance is None:
+                instance = Request.instances[api_key] = Request.RequestSingleton(delay)
+            elif delay > instance.delay:
+                instance.delay = delay
+            return instance
+
+    @staticmethod
+    def check_status(status_code, headers):
+        # takes the status and headers rather than the response, so requests and aiohttp responses can share it
+        if status_code in (420, 429):
+            retry_after = headers.get('Retry-After')
+            raise RateLimitError('Rate limit exceeded (HTTP {})'.format(status_code),
+                                 float(retry_after) if retry_after and retry_after.isdigit() else None)
+
+    # responses are decoded straight from their bytes with the fastest installed JSON library
+    if orjson is not None:
+        decoder = staticmethod(orjson.loads)
+    elif ujson is not None:
+        decoder = staticmethod(ujson.loads)
+    else:
+        decoder = staticmethod(json.loads)
+
+    @staticmethod
+    def create_session(pool_size=10, retries=3):
+        # retries only cover connection level failures (resets, refused connections, read errors),
+        # HTTP error statuses are passed through to the caller
+        retry = Retry(total=retries, connect=retries, read=retries, status=0,
+                      allowed_methods=frozenset(['GET']), backoff_factor=0.1, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.headers['Connection'] = 'keep-alive'
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
 
     def __init__(self, delay=1000):
-        if not Request.instance:
-            Request.instance = Request.RequestSingleton(delay)
-        else:
-            Request.instance.delay = delay
+        with Request.lock:
+            if not Request.instance:
+                Request.instance = Request.RequestSingleton(delay)
+            else:
+                Request.instance.delay = delay
 
     def __getattr__(self, name):
         return getattr(self.instance, name)
 
 
 class Api:
-    def __init__(self, api_key, user_agent, delay=1000):
+    def __init__(self, api_key, user_agent, delay=1000, rate_limiter=None, session=None, pool_size=10, retries=3,
+                 cache=None, revalidate=False, lazy=False, identity_map=None, decoder=None, hooks=None,
+                 metrics=None, rate_limit_retries=3, coalesce=True):
         self.base_url = 'http://www.giantbomb.com/api/'
         self.api_key = api_key
         self.user_agent = user_agent
         self.delay = delay
+        self.rate_limiter = rate_limiter
+        # an Api given its own rate_limiter doesn't take part in, or change, the shared budget of its key
+        if rate_limiter is None:
+            self.transport = Request.register(api_key, delay)
+        else:
+            self.transport = Request.RequestSingleton(delay)
+        self.session = Request.create_session(pool_size, retries) if session is None else session
+        self.cache = cache
+        self.revalidate = revalidate
+        self.lazy = lazy
+        self.identity_map = IdentityMap() if identity_map is True else identity_map
+        self.decoder = decoder
+        self.hooks = [] if hooks is None else list(hooks)
+        self.metrics = Metrics() if metrics is None else metrics
+        self.rate_limit_retries = rate_limit_retries
+        self.flights = SingleFlight() if coalesce else None
+
+    def build(self, cls, data):
+        if self.identity_map is not None:
+            return self.identity_map.model(cls, data, self.lazy, self)
+        return cls.from_dict(data, self.lazy, self)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     @staticmethod
     def verify_response(response):
         try:
+            if response['status_code'] == 107:
+                raise RateLimitError('Rate limit exceeded')
             if not response['status_code'] == 1:
                 raise ApiError('Status code returned not 1')
         except KeyError as e:
@@ -61,23 +774,178 @@ class Api:
 
     @staticmethod
     def trim_attributes(instance):
-        fields = instance.__dict__
-        for field in fields:
+        for field in type(instance).__slots__:
+            value = getattr(instance, field)
             try:
-                if len(fields[field]) == 1:
-                    setattr(instance, field, fields[field][0])
+                if len(value) == 1:
+                    setattr(instance, field, value[0])
             except TypeError:
                 pass
 
+    @staticmethod
+    def cache_key(url, params):
+        return url + '?' + urlencode(sorted((key, value) for key, value in params.items()
+                                            if key not in ('api_key', 'format')))
+
+    def url_template(self, url):
+        # game/3030-1 becomes game/{id}, list and search urls are kept as they are
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        parts = path.split('/')
+        if len(parts) > 1 and parts[1]:
+            parts[1] = '{id}'
+        return '/'.join(parts)
+
+    def add_hook(self, hook):
+        # hook is called with the RequestEvent of every Api.get and Api.stream call
+        self.hooks.append(hook)
+
+    def emit(self, event):
+        # called from finally blocks, a failing hook is logged rather than replacing the response or the real error
+        self.metrics.record(event)
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                logging.getLogger(__name__).exception('Request hook %r failed', hook)
+
     def get(self, url, params=None):
         params = {} if params is None else params
+        key = Api.cache_key(url, params)
+        resource = url[len(self.base_url):].split('/', 1)[0] if url.startswith(self.base_url) else None
+        event = RequestEvent(url, self.url_template(url))
+        try:
+            if self.cache is not None:
+                event.cache = 'hit'
+                response = self.cache.get(key)
+                if response is not None:
+                    return response
+            if self.flights is None:
+                return self.load(url, params, key, resource, event)
+
+            # identical requests already in flight are waited on rather than sent again
+            start = time.perf_counter()
+            try:
+                return self.flights.do(key, lambda: self.load(url, params, key, resource, event),
+                                       lambda: setattr(event, 'coalesced', True))
+            finally:
+                if event.coalesced:
+                    event.cache = None if self.cache is None else 'miss'
+                    event.wait_time += time.perf_counter() - start
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            self.emit(event)
+
+    def load(self, url, params, key, resource, event):
+        # the part of get that goes past a cache miss: revalidating a stale entry or fetching and caching
+        if self.cache is not None and self.revalidate:
+            event.cache = 'revalidated'
+            response = self.revalidate_response(url, key, resource, event)
+            if response is not None:
+                return response
+        if self.cache is not None:
+            event.cache = 'miss'
+
+        response = self.fetch(url, params, event)
+        if self.cache is not None:
+            self.cache.set(key, response, resource)
+        return response
+
+    def wait_after_rate_limit(self, rate_limiter, error, attempt, event=None):
+        # tells the limiter about the violation and sleeps before the next attempt, or gives up
+        rate_limiter.penalize()
+        if attempt >= self.rate_limit_retries:
+            raise error
+        delay = max(RateLimiter.backoff(attempt), error.retry_after or 0)
+        time.sleep(delay)
+        if event is not None:
+            event.wait_time += delay
+            event.retries += 1
+
+    def fetch(self, url, params=None, event=None):
+        # always goes to the network, bypassing the cache. rate limit rejections are retried with backoff
+        params = {} if params is None else params
+        params['api_key'] = self.api_key
+        params['format'] = 'json'
+        requester = self.transport
+        rate_limiter = requester.rate_limiter if self.rate_limiter is None else self.rate_limiter
+        attempt = 0
+        while True:
+            try:
+                response = requester.get(url, self.user_agent, params, rate_limiter, self.session, self.decoder, event)
+                Api.verify_response(response)
+            except RateLimitError as e:
+                self.wait_after_rate_limit(rate_limiter, e, attempt, event)
+                attempt += 1
+                continue
+            rate_limiter.reward()
+            return response
+
+    def stream(self, url, params=None, summary=None):
+        # incremental counterpart of fetch for list and search endpoints, never cached
+        params = {} if params is None else params
+        summary = {} if summary is None else summary
         params['api_key'] = self.api_key
         params['format'] = 'json'
-        requester = Request(self.delay)
-        response = requester.get(url, self.user_agent, params)
+        requester = self.transport
+        rate_limiter = requester.rate_limiter if self.rate_limiter is None else self.rate_limiter
+        event = RequestEvent(url, self.url_template(url))
+        attempt = 0
+        try:
+            while True:
+                # a rate limit rejection can only be retried before any result has been handed out
+                verified = False
+                yielded = False
+                try:
+                    for result in requester.stream(url, self.user_agent, params, rate_limiter, self.session, summary,
+                                                   event):
+                        if not verified and 'status_code' in summary:
+                            Api.verify_response(summary)
+                            verified = True
+                        yielded = True
+                        yield result
+                    Api.verify_response(summary)
+                except RateLimitError as e:
+                    if yielded:
+                        raise
+                    self.wait_after_rate_limit(rate_limiter, e, attempt, event)
+                    attempt += 1
+                    summary.clear()
+                    continue
+                rate_limiter.reward()
+                return
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            self.emit(event)
+
+    def revalidate_response(self, url, key, resource, event=None):
+        # a stale detail response is reused if its date_last_updated hasn't changed on the server
+        stale = self.cache.get_stale(key)
+        if stale is None:
+            return None
+        results = stale.get('results')
+        if not isinstance(results, dict) or results.get('date_last_updated') is None:
+            return None
+
+        current = self.fetch(url, {'field_list': 'id,date_last_updated'}, event)['results']
+        if current.get('date_last_updated') != results['date_last_updated']:
+            return None
+        self.cache.touch(key, resource)
+        return stale
+
+    def get_resource(self, cls, id_, field_list=None):
+        # cls can be a model or a view, a view's own field_list is used when none is given
+        field_list = cls.field_list if field_list is None else field_list
+        field_list = [] if field_list is None else field_list
 
-        Api.verify_response(response)
-        return response
+        url = self.base_url + '{}/{}'.format(cls.resource, id_)
+        res = self.get(url, params={
+            'field_list': ','.join(field for field in field_list)
+        })['results']
+        return self.build(cls, res)
 
     def get_accessory(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -86,7 +954,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Accessory.from_dict(res)
+        return self.build(Accessory, res)
 
     def get_character(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -95,7 +963,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Character.from_dict(res)
+        return self.build(Character, res)
 
     def get_chat(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -104,7 +972,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Chat.from_dict(res)
+        return self.build(Chat, res)
 
     def get_company(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -113,7 +981,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Company.from_dict(res)
+        return self.build(Company, res)
 
     def get_concept(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -122,7 +990,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Concept.from_dict(res)
+        return self.build(Concept, res)
 
     def get_franchise(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -131,7 +999,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Franchise.from_dict(res)
+        return self.build(Franchise, res)
 
     def get_game(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -140,7 +1008,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Game.from_dict(res)
+        return self.build(Game, res)
 
     def get_game_rating(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -149,7 +1017,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return GameRating.from_dict(res)
+        return self.build(GameRating, res)
 
     def get_genre(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -158,7 +1026,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Genre.from_dict(res)
+        return self.build(Genre, res)
 
     def get_location(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -167,7 +1035,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Location.from_dict(res)
+        return self.build(Location, res)
 
     def get_object(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -176,7 +1044,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Object.from_dict(res)
+        return self.build(Object, res)
 
     def get_person(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -185,7 +1053,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Person.from_dict(res)
+        return self.build(Person, res)
 
     def get_platform(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -194,7 +1062,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Platform.from_dict(res)
+        return self.build(Platform, res)
 
     def get_promo(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -203,7 +1071,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Promo.from_dict(res)
+        return self.build(Promo, res)
 
     def get_rating_board(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -212,7 +1080,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return RatingBoard.from_dict(res)
+        return self.build(RatingBoard, res)
 
     def get_region(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -221,7 +1089,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Region.from_dict(res)
+        return self.build(Region, res)
 
     def get_release(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -230,7 +1098,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Release.from_dict(res)
+        return self.build(Release, res)
 
     def get_review(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -239,7 +1107,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Review.from_dict(res)
+        return self.build(Review, res)
 
     def get_theme(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -248,12 +1116,12 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Theme.from_dict(res)
+        return self.build(Theme, res)
 
     def get_types(self, id_):
         url = self.base_url + 'types/{}'.format(id_)
         res = self.get(url)['results']
-        return Types.from_dict(res)
+        return self.build(Types, res)
 
     def get_user_review(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -262,7 +1130,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return UserReview.from_dict(res)
+        return self.build(UserReview, res)
 
     def get_video(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -271,7 +1139,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return Video.from_dict(res)
+        return self.build(Video, res)
 
     def get_video_type(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -280,7 +1148,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return VideoType.from_dict(res)
+        return self.build(VideoType, res)
 
     def get_video_category(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -289,7 +1157,7 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return VideoCategory.from_dict(res)
+        return self.build(VideoCategory, res)
 
     def get_video_show(self, id_, field_list=None):
         field_list = [] if field_list is None else field_list
@@ -297,19 +1165,313 @@ class Api:
         res = self.get(url, params={
             'field_list': ','.join(field for field in field_list)
         })['results']
-        return VideoShow.from_dict(res)
+        return self.build(VideoShow, res)
 
-    def search(self, query, resources=None, field_list=None, limit=10, page=None):
-        resources = [] if resources is None else resources
+    @staticmethod
+    def prefetch(iterable, depth):
+        # runs iterable on a background thread, keeping at most depth items buffered ahead of the consumer
+        if depth <= 0:
+            yield from iterable
+            return
+
+        buffer = queue.Queue(maxsize=depth)
+        stop = threading.Event()
+        done = object()
+
+        def produce():
+            try:
+                for item in iterable:
+                    while not stop.is_set():
+                        try:
+                            buffer.put((item, None), timeout=0.1)
+                            break
+                        except queue.Full:
+                            pass
+                    if stop.is_set():
+                        return
+                item, error = done, None
+            except Exception as e:
+                item, error = done, e
+            while not stop.is_set():
+                try:
+                    buffer.put((item, error), timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(produce,), daemon=True)
+        thread.start()
+        try:
+            while True:
+                item, error = buffer.get()
+                if error is not None:
+                    raise error
+                if item is done:
+                    return
+                yield item
+        finally:
+            stop.set()
+
+    def iter_pages(self, url, params=None, limit=100, offset=0, prefetch=0):
+        # lazily walks a paginated endpoint, yielding one response page at a time.
+        # with prefetch > 0 up to that many pages are downloaded ahead while the current one is consumed
+        if prefetch > 0:
+            yield from Api.prefetch(self.iter_pages(url, params, limit, offset), prefetch)
+            return
+
+        params = {} if params is None else params
+        while True:
+            page_params = dict(params, limit=str(limit), offset=str(offset))
+            response = self.get(url, params=page_params)
+            yield response
+            offset += response['number_of_page_results']
+            if response['number_of_page_results'] == 0 or offset >= response['number_of_total_results']:
+                break
+
+    def iter_stream(self, url, params=None, limit=100, offset=0):
+        # like iter_pages but yields individual results parsed incrementally off the socket
+        params = {} if params is None else params
+        while True:
+            summary = {}
+            count = 0
+            for result in self.stream(url, dict(params, limit=str(limit), offset=str(offset)), summary):
+                count += 1
+                yield result
+            offset += count
+            if count == 0 or offset >= summary.get('number_of_total_results', 0):
+                break
+
+    def iter_list(self, resource, cls, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0,
+                  stream=False):
+        # with stream, results are built as they are parsed and prefetch counts results instead of pages
+        field_list = cls.field_list if field_list is None else field_list
         field_list = [] if field_list is None else field_list
-        page = [] if page is None else page
-        url = self.base_url + 'search/'
-        res = self.get(url, params={'query': query,
-                                    'resources': ','.join(resource for resource in resources),
-                                    'field_list': ','.join(field for field in field_list),
-                                    'limit': str(limit),
-                                    'page': str(page)
-                                    })['results']
+        if isinstance(filter_, dict):
+            filter_ = ','.join('{}:{}'.format(field, value) for field, value in filter_.items())
+
+        url = self.base_url + '{}/'.format(resource)
+        params = {'field_list': ','.join(field for field in field_list)}
+        if filter_:
+            params['filter'] = filter_
+        if sort:
+            params['sort'] = sort
+        if stream:
+            for result in Api.prefetch(self.iter_stream(url, params, limit, offset), prefetch):
+                yield self.build(cls, result)
+            return
+
+        for response in self.iter_pages(url, params, limit, offset, prefetch):
+            for result in response['results']:
+                yield self.build(cls, result)
+
+    def iter_accessories(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('accessories', Accessory, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_characters(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('characters', Character, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_chats(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('chats', Chat, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_companies(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('companies', Company, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_concepts(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('concepts', Concept, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_franchises(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('franchises', Franchise, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_games(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('games', Game, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_game_ratings(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0,
+                          stream=False):
+        return self.iter_list('game_ratings', GameRating, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_genres(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('genres', Genre, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_locations(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('locations', Location, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_objects(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('objects', Object, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_people(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('people', Person, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_platforms(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('platforms', Platform, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_promos(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('promos', Promo, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_rating_boards(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0,
+                           stream=False):
+        return self.iter_list('rating_boards', RatingBoard, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_regions(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('regions', Region, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_releases(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('releases', Release, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_reviews(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('reviews', Review, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_themes(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('themes', Theme, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_user_reviews(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0,
+                          stream=False):
+        return self.iter_list('user_reviews', UserReview, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_videos(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('videos', Video, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_video_types(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('video_types', VideoType, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def iter_video_categories(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0,
+                              stream=False):
+        return self.iter_list('video_categories', VideoCategory, filter_, sort, field_list, limit, offset, prefetch,
+                              stream)
+
+    def iter_video_shows(self, filter_=None, sort=None, field_list=None, limit=100, offset=0, prefetch=0, stream=False):
+        return self.iter_list('video_shows', VideoShow, filter_, sort, field_list, limit, offset, prefetch, stream)
+
+    def resolve(self, reference, field_list=None):
+        return getattr(self, 'get_{}'.format(reference.resource))(reference.guid, field_list)
+
+    def resolve_many(self, references, field_list=None, max_workers=4, batch=False):
+        # identical references are only fetched once, results come back in the order of references.
+        # with batch they are looked up through the list endpoints, see get_batch
+        references = list(references)
+        guids = {}
+        for reference in references:
+            guids.setdefault(reference.resource, {})[reference.guid] = None
+        resolved = {}
+        for resource, ids in guids.items():
+            if batch:
+                results = self.get_batch(resource, list(ids), field_list, max_workers=max_workers)
+            else:
+                results = self.get_many(resource, list(ids), field_list, max_workers)
+            for result in results:
+                if result.error is not None:
+                    raise result.error
+                resolved[(resource, result.id)] = result.result
+        return [resolved[(reference.resource, reference.guid)] for reference in references]
+
+    def get_many(self, resource, ids, field_list=None, max_workers=4, ordered=True):
+        # yields a BulkResult per id, failures are collected on the result instead of aborting the batch
+        if isinstance(resource, type):
+            cls = resource
+
+            def getter(id_, field_list=None):
+                return self.get_resource(cls, id_, field_list)
+        else:
+            getter = getattr(self, 'get_{}'.format(resource), None)
+        if getter is None:
+            raise ApiError('Unknown resource: {}'.format(resource))
+
+        def fetch(id_):
+            try:
+                if field_list is None:
+                    return BulkResult(id_, result=getter(id_))
+                return BulkResult(id_, result=getter(id_, field_list))
+            except Exception as e:
+                # a malformed payload fails its own id like a network or API error does, never the whole batch
+                return BulkResult(id_, error=e)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [executor.submit(contextvars.copy_context().run, fetch, id_) for id_ in ids]
+            for future in (futures if ordered else as_completed(futures)):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def numeric_id(id_):
+        # 3030-1, '1' and 1 all become 1, None when id_ can only be looked up through a detail endpoint
+        try:
+            return int(str(id_).rsplit('-', 1)[-1])
+        except ValueError:
+            return None
+
+    def get_batch(self, resource, ids, field_list=None, chunk_size=100, max_workers=4):
+        # like get_many, but ids are looked up chunk_size at a time through the list endpoint with filter=id:a|b|c.
+        # only keys a list response is missing are fetched from the detail endpoint, one request per id. without a
+        # field_list the list_fields of the model are requested, so no detail requests are needed, an empty one
+        # asks for every field like it does everywhere else. results are yielded chunk by chunk, a chunk whose list
+        # request fails gets that error on the results of its ids
+        cls = Model.models.get(resource) if isinstance(resource, str) else resource
+        if cls is None:
+            raise ApiError('Unknown resource: {}'.format(resource))
+        if cls.list_resource is None or 'id' not in cls.field_keys:
+            yield from self.get_many(cls, ids, field_list, max_workers)
+            return
+        field_list = cls.field_list if field_list is None else field_list
+        field_list = list(cls.list_keys) if field_list is None else list(field_list)
+        field_list = field_list or [key for field, key in cls.schema]
+
+        ids = list(ids)
+        numeric = {id_: Api.numeric_id(id_) for id_ in ids}
+        # the API returns at most 100 results per request
+        chunk_size = min(chunk_size, 100)
+        url = self.base_url + '{}/'.format(cls.list_resource)
+        list_keys = [key for key in field_list if key in cls.list_keys]
+        params = {'field_list': ','.join(dict.fromkeys(list_keys + ['id', 'api_detail_url']))}
+        found = {}
+
+        def look_up(chunk):
+            wanted = [number for number in dict.fromkeys(numeric[id_] for id_ in chunk)
+                      if number is not None and number not in found]
+            if not wanted:
+                return None
+            chunk_params = dict(params, filter='id:{}'.format('|'.join(str(number) for number in wanted)))
+            try:
+                for response in self.iter_pages(url, chunk_params, limit=len(wanted)):
+                    for result in response['results']:
+                        found[result['id']] = result
+            except Exception as e:
+                return e
+            return None
+
+        def complete(id_, error=None):
+            data = found.get(numeric[id_])
+            if data is None and error is not None:
+                return BulkResult(id_, error=error)
+            try:
+                if data is None:
+                    # not returned by the list endpoint, the detail endpoint decides whether it exists
+                    url = self.base_url + '{}/{}'.format(cls.resource, id_)
+                    data = self.get(url, {'field_list': ','.join(field_list)})['results']
+                else:
+                    missing = [key for key in field_list if key not in data]
+                    if missing:
+                        guid = (data.get('api_detail_url') or str(id_)).rstrip('/').rsplit('/', 1)[-1]
+                        url = self.base_url + '{}/{}'.format(cls.resource, guid)
+                        detail = self.get(url, {'field_list': ','.join(missing)})['results']
+                        data = dict(data, **{key: detail.get(key) for key in missing})
+                return BulkResult(id_, result=self.build(cls, data))
+            except Exception as e:
+                return BulkResult(id_, error=e)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                error = look_up(chunk)
+                futures = [executor.submit(contextvars.copy_context().run, complete, id_, error) for id_ in chunk]
+                for future in futures:
+                    yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def sort_search_results(res, build):
         games = []
         franchises = []
         characters = []
@@ -322,23 +1484,23 @@ class Api:
 
         for result in res:
             if result['resource_type'] == 'game':
-                games.append(Game.from_dict(result))
+                games.append(build(Game, result))
             elif result['resource_type'] == 'franchise':
-                franchises.append(Franchise.from_dict(result))
+                franchises.append(build(Franchise, result))
             elif result['resource_type'] == 'character':
-                characters.append(Character.from_dict(result))
+                characters.append(build(Character, result))
             elif result['resource_type'] == 'concept':
-                concepts.append(Concept.from_dict(result))
+                concepts.append(build(Concept, result))
             elif result['resource_type'] == 'object':
-                objects.append(Object.from_dict(result))
+                objects.append(build(Object, result))
             elif result['resource_type'] == 'location':
-                locations.append(Location.from_dict(result))
+                locations.append(build(Location, result))
             elif result['resource_type'] == 'person':
-                people.append(Person.from_dict(result))
+                people.append(build(Person, result))
             elif result['resource_type'] == 'company':
-                companies.append(Company.from_dict(result))
+                companies.append(build(Company, result))
             elif result['resource_type'] == 'video':
-                videos.append(Video.from_dict(result))
+                videos.append(build(Video, result))
 
         return SearchResults(games=games,
                              franchises=franchises,
@@ -350,1105 +1512,739 @@ class Api:
                              companies=companies,
                              videos=videos)
 
+    @staticmethod
+    def search_result_from_dict(result, build):
+        classes = {'game': Game,
+                   'franchise': Franchise,
+                   'character': Character,
+                   'concept': Concept,
+                   'object': Object,
+                   'location': Location,
+                   'person': Person,
+                   'company': Company,
+                   'video': Video}
+        cls = classes.get(result.get('resource_type'))
+        return None if cls is None else build(cls, result)
 
-class Accessory:
-    def __init__(self,
-                 api_detail_url=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 id_=None,
-                 image=None,
-                 name=None,
-                 site_detail_url=None):
+    @staticmethod
+    def search_params(query, resources=None, field_list=None, limit=10, page=None):
+        resources = [] if resources is None else resources
+        field_list = [] if field_list is None else field_list
+        params = {'query': query,
+                  'resources': ','.join(resource for resource in resources),
+                  'field_list': ','.join(field for field in field_list),
+                  'limit': str(limit)}
+        if page is not None:
+            params['page'] = str(page)
+        return params
 
-        self.api_detail_url = api_detail_url
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.id = id_
-        self.image = image
-        self.name = name
-        self.site_detail_url = site_detail_url
+    def search(self, query, resources=None, field_list=None, limit=10, page=None):
+        url = self.base_url + 'search/'
+        res = self.get(url, params=Api.search_params(query, resources, field_list, limit, page))['results']
+        return Api.sort_search_results(res, self.build)
+
+    def search_all(self, query, resources=None, field_list=None, max_results=None, limit=10, prefetch=0,
+                   stream=False):
+        # streams typed results across as many pages as needed, the first page's
+        # number_of_total_results decides how many more pages get requested.
+        # with stream, each page is parsed incrementally and prefetch counts results instead of pages
+        url = self.base_url + 'search/'
 
-        Api.trim_attributes(self)
+        def pages():
+            response = self.get(url, params=Api.search_params(query, resources, field_list, limit, 1))
+            yield response
+            total = response['number_of_total_results']
+            if max_results is not None:
+                total = min(total, max_results)
+            for page in range(2, (total + limit - 1) // limit + 1):
+                response = self.get(url, params=Api.search_params(query, resources, field_list, limit, page))
+                if not response['results']:
+                    return
+                yield response
+
+        def streamed():
+            page = 1
+            while True:
+                summary = {}
+                count = 0
+                for result in self.stream(url, Api.search_params(query, resources, field_list, limit, page), summary):
+                    count += 1
+                    yield result
+                total = summary.get('number_of_total_results', 0)
+                if max_results is not None:
+                    total = min(total, max_results)
+                if count == 0 or page * limit >= total:
+                    return
+                page += 1
+
+        if stream:
+            results = Api.prefetch(streamed(), prefetch)
+        else:
+            results = (result for response in Api.prefetch(pages(), prefetch) for result in response['results'])
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('name', None),
-                   data.get('site_detail_url', None),)
+        count = 0
+        for result in results:
+            if max_results is not None and count >= max_results:
+                return
+            model = Api.search_result_from_dict(result, self.build)
+            if model is not None:
+                count += 1
+                yield model
+
+
+class BulkResult:
+    def __init__(self, id_=None, result=None, error=None):
+        self.id = id_
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
 
     def __repr__(self):
-        return '{} {{{}}}'.format(self.name, self.id)
+        return '{} {{{}}}'.format(self.result if self.ok else self.error, self.id)
 
 
-class Character:
-    def __init__(self,
-                 aliases=None,
-                 api_detail_url=None,
-                 birthday=None,
-                 concepts=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 enemies=None,
-                 first_appeared_in_game=None,
-                 franchises=None,
-                 friends=None,
-                 games=None,
-                 gender=None,
-                 id_=None,
-                 image=None,
-                 last_name=None,
-                 locations=None,
-                 name=None,
-                 objects=None,
-                 people=None,
-                 real_name=None,
-                 site_detail_url=None):
-        self.aliases = aliases
-        self.api_detail_url = api_detail_url
-        self.birthday = birthday
-        self.concepts = concepts
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.enemies = enemies
-        self.first_appeared_in_game = first_appeared_in_game
-        self.franchises = franchises
-        self.friends = friends
-        self.games = games
-        self.gender = gender
-        self.id = id_
-        self.image = image
-        self.last_name = last_name
-        self.locations = locations
-        self.name = name
-        self.objects = objects
-        self.people = people
-        self.real_name = real_name
-        self.site_detail_url = site_detail_url
+class AsyncApi:
+    def __init__(self, api_key, user_agent, delay=1000, rate_limiter=None, session=None, pool_size=10, lazy=False,
+                 identity_map=None, decoder=None, coalesce=True, rate_limit_retries=3):
+        if aiohttp is None:
+            raise ApiError('AsyncApi requires aiohttp to be installed')
+        self.base_url = 'http://www.giantbomb.com/api/'
+        self.api_key = api_key
+        self.user_agent = user_agent
+        self.delay = delay
+        self.rate_limiter = AsyncRateLimiter.from_delay(delay) if rate_limiter is None else rate_limiter
+        self.pool_size = pool_size
+        self.session = session
+        self.lazy = lazy
+        self.identity_map = IdentityMap() if identity_map is True else identity_map
+        self.decoder = Request.decoder if decoder is None else decoder
+        self.flights = {} if coalesce else None
+        self.rate_limit_retries = rate_limit_retries
+
+    def build(self, cls, data):
+        if self.identity_map is not None:
+            return self.identity_map.model(cls, data, self.lazy, self)
+        return cls.from_dict(data, self.lazy, self)
+
+    def get_session(self):
+        # the session has to be created from inside a running event loop
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.session = aiohttp.ClientSession(connector=connector, headers={'user-agent': self.user_agent})
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def get(self, url, params=None):
+        params = {} if params is None else params
+        if self.flights is None:
+            return await self.fetch(url, params)
+
+        # coroutines asking for the same url and params while it is in flight share one task. it is shielded so
+        # one caller being cancelled doesn't cancel the request for the others
+        key = Api.cache_key(url, params)
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = self.flights[key] = asyncio.ensure_future(self.fetch(url, params))
+            flight.add_done_callback(lambda _: self.flights.pop(key, None))
+        return await asyncio.shield(flight)
+
+    async def fetch(self, url, params=None):
+        # rate limit rejections are retried with backoff like Api.fetch does, sleeping without blocking the loop
+        params = {} if params is None else params
+        params['api_key'] = self.api_key
+        params['format'] = 'json'
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            try:
+                async with self.get_session().get(url, params=params) as res:
+                    Request.check_status(res.status, res.headers)
+                    content = await res.read()
+                    try:
+                        response = self.decoder(content)
+                    except ValueError:
+                        raise ApiError('URL provided returned invalid results:\nurl: {}\nparams: {}'.format(url,
+                                                                                                           params))
+                Api.verify_response(response)
+            except RateLimitError as e:
+                self.rate_limiter.penalize()
+                if attempt >= self.rate_limit_retries:
+                    raise
+                await asyncio.sleep(max(RateLimiter.backoff(attempt), e.retry_after or 0))
+                attempt += 1
+                continue
+            self.rate_limiter.reward()
+            return response
+
+    async def resolve(self, reference, field_list=None):
+        return await getattr(self, 'get_{}'.format(reference.resource))(reference.guid, field_list)
+
+    async def get_resource(self, cls, id_, field_list=None):
+        field_list = cls.field_list if field_list is None else field_list
+        field_list = [] if field_list is None else field_list
 
-        Api.trim_attributes(self)
+        url = self.base_url + '{}/{}'.format(cls.resource, id_)
+        res = (await self.get(url, params={
+            'field_list': ','.join(field for field in field_list)
+        }))['results']
+        return self.build(cls, res)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('aliases', None),
-                   data.get('api_detail_url', None),
-                   data.get('birthday', None),
-                   data.get('concepts', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('enemies', None),
-                   data.get('first_appeared_in_game', None),
-                   data.get('franchises', None),
-                   data.get('friends', None),
-                   data.get('games', None),
-                   data.get('gender', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('last_name', None),
-                   data.get('locations', None),
-                   data.get('name', None),
-                   data.get('objects', None),
-                   data.get('people', None),
-                   data.get('real_name', None),
-                   data.get('site_detail_url', None))
+    async def get_accessory(self, id_, field_list=None):
+        return await self.get_resource(Accessory, id_, field_list)
 
-    def __repr__(self):
-        return '{} {{{}}}'.format(self.name, self.id)
+    async def get_character(self, id_, field_list=None):
+        return await self.get_resource(Character, id_, field_list)
 
+    async def get_chat(self, id_, field_list=None):
+        return await self.get_resource(Chat, id_, field_list)
 
-class Chat:
-    def __init__(self,
-                 api_detail_url=None,
-                 channel_name=None,
-                 deck=None,
-                 image=None,
-                 password=None,
-                 site_detail_url=None,
-                 title=None):
-        self.api_detail_url = api_detail_url
-        self.channel_name = channel_name
-        self.deck = deck
-        self.image = image
-        self.password = password
-        self.site_detail_url = site_detail_url
-        self.title = title
+    async def get_company(self, id_, field_list=None):
+        return await self.get_resource(Company, id_, field_list)
 
-        Api.trim_attributes(self)
+    async def get_concept(self, id_, field_list=None):
+        return await self.get_resource(Concept, id_, field_list)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('channel_name', None),
-                   data.get('deck', None),
-                   data.get('image', None),
-                   data.get('password', None),
-                   data.get('site_detail_url', None),
-                   data.get('title', None))
+    async def get_franchise(self, id_, field_list=None):
+        return await self.get_resource(Franchise, id_, field_list)
 
-    def __repr__(self):
-        return '{} {{{}}}'.format(self.channel_name, self.title)
+    async def get_game(self, id_, field_list=None):
+        return await self.get_resource(Game, id_, field_list)
 
+    async def get_game_rating(self, id_, field_list=None):
+        return await self.get_resource(GameRating, id_, field_list)
 
-class Company:
-    def __init__(self,
-                 abbreviation=None,
-                 aliases=None,
-                 api_detail_url=None,
-                 characters=None,
-                 concepts=None,
-                 date_added=None,
-                 date_founded=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 developed_games=None,
-                 developer_releases=None,
-                 distributor_releases=None,
-                 id_=None,
-                 image=None,
-                 location_address=None,
-                 location_city=None,
-                 location_country=None,
-                 location_state=None,
-                 locations=None,
-                 name=None,
-                 objects=None,
-                 people=None,
-                 phone=None,
-                 published_games=None,
-                 publisher_releases=None,
-                 site_detail_url=None,
-                 website=None
-                 ):
-        self.abbreviation = abbreviation
-        self.aliases = aliases
-        self.api_detail_url = api_detail_url
-        self.characters = characters
-        self.concepts = concepts
-        self.date_added = date_added
-        self.date_founded = date_founded
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.developed_games = developed_games
-        self.developer_releases = developer_releases
-        self.distributor_releases = distributor_releases
-        self.id = id_
-        self.image = image
-        self.location_address = location_address
-        self.location_city = location_city
-        self.location_country = location_country
-        self.location_state = location_state
-        self.locations = locations
-        self.name = name
-        self.objects = objects
-        self.people = people
-        self.phone = phone
-        self.published_games = published_games
-        self.published_releases = publisher_releases
-        self.site_detail_url = site_detail_url
-        self.website = website
+    async def get_genre(self, id_, field_list=None):
+        return await self.get_resource(Genre, id_, field_list)
 
-        Api.trim_attributes(self)
+    async def get_location(self, id_, field_list=None):
+        return await self.get_resource(Location, id_, field_list)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('abbreviation', None),
-                   data.get('aliases', None),
-                   data.get('api_detail_url', None),
-                   data.get('characters', None),
-                   data.get('concepts', None),
-                   data.get('date_added', None),
-                   data.get('date_founded', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('developed_games', None),
-                   data.get('developer_releases', None),
-                   data.get('distributor_releases', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('location_address', None),
-                   data.get('location_city', None),
-                   data.get('location_country', None),
-                   data.get('location_state', None),
-                   data.get('locations', None),
-                   data.get('name', None),
-                   data.get('objects', None),
-                   data.get('people', None),
-                   data.get('phone', None),
-                   data.get('published_games', None),
-                   data.get('published_releases', None),
-                   data.get('site_detail_url', None),
-                   data.get('website', None))
+    async def get_object(self, id_, field_list=None):
+        return await self.get_resource(Object, id_, field_list)
 
-    def __repr__(self):
-        return '{} {{{}}}'.format(self.name, self.id)
+    async def get_person(self, id_, field_list=None):
+        return await self.get_resource(Person, id_, field_list)
 
+    async def get_platform(self, id_, field_list=None):
+        return await self.get_resource(Platform, id_, field_list)
 
-class Concept:
-    def __init__(self,
-                 aliases=None,
-                 api_detail_url=None,
-                 characters=None,
-                 concepts=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 first_appeared_in_franchise=None,
-                 first_appeared_in_game=None,
-                 franchises=None,
-                 games=None,
-                 id_=None,
-                 image=None,
-                 locations=None,
-                 name=None,
-                 objects=None,
-                 people=None,
-                 related_concepts=None,
-                 site_detail_url=None):
-        self.aliases = aliases
-        self.api_detail_url = api_detail_url
-        self.characters = characters
-        self.concepts = concepts
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.first_appeared_in_franchise = first_appeared_in_franchise
-        self.first_appeared_in_game = first_appeared_in_game
-        self.franchises = franchises
-        self.games = games
-        self.id = id_
-        self.image = image
-        self.locations = locations
-        self.name = name
-        self.objects = objects
-        self.people = people
-        self.related_concepts = related_concepts
-        self.site_detail_url = site_detail_url
+    async def get_promo(self, id_, field_list=None):
+        return await self.get_resource(Promo, id_, field_list)
 
-        Api.trim_attributes(self)
+    async def get_rating_board(self, id_, field_list=None):
+        return await self.get_resource(RatingBoard, id_, field_list)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('aliases', None),
-                   data.get('api_detail_url', None),
-                   data.get('characters', None),
-                   data.get('concepts', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('first_appeared_in_franchise', None),
-                   data.get('first_appeared_in_game', None),
-                   data.get('franchises', None),
-                   data.get('games', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('locations', None),
-                   data.get('name', None),
-                   data.get('objects', None),
-                   data.get('people', None),
-                   data.get('related_concepts', None),
-                   data.get('site_detail_url', None))
+    async def get_region(self, id_, field_list=None):
+        return await self.get_resource(Region, id_, field_list)
 
-    def __repr__(self):
-        return '{} {{{}}}'.format(self.name, self.id)
+    async def get_release(self, id_, field_list=None):
+        return await self.get_resource(Release, id_, field_list)
 
+    async def get_review(self, id_, field_list=None):
+        return await self.get_resource(Review, id_, field_list)
 
-class Franchise:
-    def __init__(self,
-                 aliases=None,
-                 api_detail_url=None,
-                 characters=None,
-                 concepts=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 games=None,
-                 id_=None,
-                 image=None,
-                 locations=None,
-                 name=None,
-                 objects=None,
-                 people=None,
-                 site_detail_url=None):
-        self.aliases = aliases
-        self.api_detail_url = api_detail_url
-        self.characters = characters
-        self.concepts = concepts
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.games = games
-        self.id = id_
-        self.image = image
-        self.locations = locations
-        self.name = name
-        self.objects = objects
-        self.people = people
-        self.site_detail_url = site_detail_url
+    async def get_theme(self, id_, field_list=None):
+        return await self.get_resource(Theme, id_, field_list)
 
-        Api.trim_attributes(self)
+    async def get_types(self, id_):
+        url = self.base_url + 'types/{}'.format(id_)
+        res = (await self.get(url))['results']
+        return self.build(Types, res)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('aliases', None),
-                   data.get('api_detail_url', None),
-                   data.get('characters', None),
-                   data.get('concepts', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('games', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('locations', None),
-                   data.get('name', None),
-                   data.get('objects', None),
-                   data.get('people', None),
-                   data.get('site_detail_url', None))
+    async def get_user_review(self, id_, field_list=None):
+        return await self.get_resource(UserReview, id_, field_list)
 
-    def __repr__(self):
-        return '{} {{{}}}'.format(self.name, self.id)
+    async def get_video(self, id_, field_list=None):
+        return await self.get_resource(Video, id_, field_list)
 
+    async def get_video_type(self, id_, field_list=None):
+        return await self.get_resource(VideoType, id_, field_list)
 
-class Game:
-    def __init__(self,
-                 aliases=None,
-                 api_detail_url=None,
-                 characters=None,
-                 concepts=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 developers=None,
-                 expected_release_day=None,
-                 expected_release_month=None,
-                 expected_release_quarter=None,
-                 expected_release_year=None,
-                 first_appearance_characters=None,
-                 first_appearance_concepts=None,
-                 first_appearance_locations=None,
-                 first_appearance_objects=None,
-                 first_appearance_people=None,
-                 franchises=None,
-                 genres=None,
-                 id_=None,
-                 image=None,
-                 images=None,
-                 killed_characters=None,
-                 locations=None,
-                 name=None,
-                 number_of_user_reviews=None,
-                 objects=None,
-                 original_game_rating=None,
-                 original_release_date=None,
-                 people=None,
-                 platforms=None,
-                 publishers=None,
-                 releases=None,
-                 reviews=None,
-                 similar_games=None,
-                 site_detail_url=None,
-                 themes=None,
-                 videos=None):
-        self.aliases = aliases
-        self.api_detail_url = api_detail_url
-        self.characters = characters
-        self.concepts = concepts
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.developers = developers
-        self.expected_release_day = expected_release_day
-        self.expected_release_month = expected_release_month
-        self.expected_release_quarter = expected_release_quarter
-        self.expected_release_year = expected_release_year
-        self.first_appearance_characters = first_appearance_characters
-        self.first_appearance_concepts = first_appearance_concepts
-        self.first_appearance_locations = first_appearance_locations
-        self.first_appearance_objects = first_appearance_objects
-        self.first_appearance_people = first_appearance_people
-        self.franchises = franchises
-        self.genres = genres
+    async def get_video_category(self, id_, field_list=None):
+        return await self.get_resource(VideoCategory, id_, field_list)
+
+    async def get_video_show(self, id_, field_list=None):
+        return await self.get_resource(VideoShow, id_, field_list)
+
+    async def search(self, query, resources=None, field_list=None, limit=10, page=None):
+        url = self.base_url + 'search/'
+        res = (await self.get(url, params=Api.search_params(query, resources, field_list, limit, page)))['results']
+        return Api.sort_search_results(res, self.build)
+
+
+class IdentityMap:
+    # hands out one shared instance per (resource, id) for as long as something else holds on to it
+    def __init__(self):
+        self.models = weakref.WeakValueDictionary()
+        self.references = weakref.WeakValueDictionary()
+        # reentrant because building a model interns the references nested inside it
+        self.lock = threading.RLock()
+
+    def model(self, cls, data, lazy=False, api=None):
+        id_ = data.get('id')
+        if id_ is None:
+            return cls.from_dict(data, lazy, api)
+        with self.lock:
+            instance = self.models.get((cls, id_))
+            if instance is None:
+                instance = cls.from_dict(data, lazy, api)
+                self.models[(cls, id_)] = instance
+            else:
+                instance.update(data, api)
+            return instance
+
+    def reference(self, resource, data, api=None):
+        id_ = data.get('id')
+        with self.lock:
+            reference = self.references.get((resource, id_))
+            if reference is None:
+                reference = Reference(resource,
+                                      id_,
+                                      data.get('name', None),
+                                      data.get('api_detail_url', None),
+                                      data.get('site_detail_url', None),
+                                      api)
+                if id_ is not None:
+                    self.references[(resource, id_)] = reference
+            else:
+                reference.update(data, api)
+            return reference
+
+    def __len__(self):
+        return len(self.models) + len(self.references)
+
+
+class Reference:
+    # a nested resource as it appears inside another resource, fetch() loads the full model through the Api
+    __slots__ = ('resource', 'id', 'name', 'api_detail_url', 'site_detail_url', 'api', '__weakref__')
+
+    def __init__(self, resource, id_=None, name=None, api_detail_url=None, site_detail_url=None, api=None):
+        self.resource = resource
         self.id = id_
-        self.image = image
-        self.images = images
-        self.killed_characters = killed_characters
-        self.locations = locations
         self.name = name
-        self.number_of_user_reviews = number_of_user_reviews
-        self.objects = objects
-        self.original_game_rating = original_game_rating
-        self.original_release_date = original_release_date
-        self.people = people
-        self.platforms = platforms
-        self.publishers = publishers
-        self.releases = releases
-        self.reviews = reviews
-        self.similar_games = similar_games
+        self.api_detail_url = api_detail_url
         self.site_detail_url = site_detail_url
-        self.themes = themes
-        self.videos = videos
-
-        Api.trim_attributes(self)
+        self.api = api
 
     @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('aliases', None),
-                   data.get('api_detail_url', None),
-                   data.get('characters', None),
-                   data.get('concepts', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('developers', None),
-                   data.get('expected_release_day', None),
-                   data.get('expected_release_month', None),
-                   data.get('expected_release_quarter', None),
-                   data.get('expected_release_year', None),
-                   data.get('first_appearance_characters', None),
-                   data.get('first_appearance_concepts', None),
-                   data.get('first_appearance_locations', None),
-                   data.get('first_appearance_objects', None),
-                   data.get('first_appearance_people', None),
-                   data.get('franchises', None),
-                   data.get('genres', None),
+    def from_dict(cls, resource, data: dict, api=None):
+        identity_map = getattr(api, 'identity_map', None)
+        if identity_map is not None:
+            return identity_map.reference(resource, data, api)
+        return cls(resource,
                    data.get('id', None),
-                   data.get('image', None),
-                   data.get('images', None),
-                   data.get('killed_characters', None),
-                   data.get('locations', None),
                    data.get('name', None),
-                   data.get('number_of_user_reviews', None),
-                   data.get('objects', None),
-                   data.get('original_game_rating', None),
-                   data.get('original_release_date', None),
-                   data.get('people', None),
-                   data.get('platforms', None),
-                   data.get('publishers', None),
-                   data.get('releases', None),
-                   data.get('reviews', None),
-                   data.get('similar_games', None),
+                   data.get('api_detail_url', None),
                    data.get('site_detail_url', None),
-                   data.get('themes', None),
-                   data.get('videos', None))
+                   api)
+
+    def update(self, data: dict, api=None):
+        # fills in what a sparser payload left out, the values present in data win
+        for field in ('name', 'api_detail_url', 'site_detail_url'):
+            if data.get(field) is not None:
+                setattr(self, field, data[field])
+        if self.api is None:
+            self.api = api
+
+    @staticmethod
+    def decode(resource, value, api=None):
+        # lists stay lists even with a single element, so game.platforms[0] works for any number of platforms
+        if type(value) is list:
+            return [Reference.from_dict(resource, item, api) if type(item) is dict else item for item in value]
+        if type(value) is dict:
+            return Reference.from_dict(resource, value, api)
+        return value
+
+    @property
+    def guid(self):
+        # detail endpoints are addressed by the guid at the end of api_detail_url, e.g. 3045-94
+        if self.api_detail_url:
+            return self.api_detail_url.rstrip('/').rsplit('/', 1)[-1]
+        return self.id
+
+    def fetch(self, field_list=None):
+        if self.api is None:
+            raise ApiError('{} is not bound to an Api'.format(self))
+        return self.api.resolve(self, field_list)
+
+    def __eq__(self, other):
+        if not isinstance(other, Reference):
+            return NotImplemented
+        return self.resource == other.resource and self.id == other.id
+
+    def __hash__(self):
+        return hash((self.resource, self.id))
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class GameRating:
-    def __init__(self,
-                 api_detail_url=None,
-                 id_=None,
-                 image=None,
-                 name=None,
-                 rating_board=None):
-        self.api_detail_url = api_detail_url
-        self.id = id_
-        self.image = image
-        self.name = name
-        self.rating_board = rating_board
+class Model:
+    # subclasses declare their fields in __slots__, from which a straight line decode function is generated.
+    # keys maps a field to the JSON key it is read from when the two differ, references maps a field holding
+    # nested resources to the resource they refer to.
+    # list_fields are the fields list endpoints return, by default every field that isn't a reference.
+    # keywords maps constructor keywords kept from older versions to the field they set.
+    # lazily built instances only hold the raw dict, each field is decoded and stored on first access
+    __slots__ = ('raw', 'api', '__weakref__')
+    resource = None
+    list_resource = None
+    keys = {}
+    references = {}
+    keywords = {'id_': 'id'}
+    list_fields = None
+    field_list = None
+    schema = ()
+    field_keys = {}
+    list_keys = ()
+    models = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.schema = tuple((field, cls.keys.get(field, field)) for field in cls.__slots__)
+        cls.field_keys = dict(cls.schema)
+        if 'list_fields' not in cls.__dict__:
+            cls.list_fields = tuple(field for field in cls.__slots__ if field not in cls.references)
+        cls.list_keys = tuple(cls.field_keys[field] for field in cls.list_fields)
+        cls.decode = staticmethod(Model.generate_decode(cls))
+        if 'model' not in cls.__dict__:
+            Model.models[cls.resource] = cls
 
-        Api.trim_attributes(self)
+    @staticmethod
+    def generate_decode(cls):
+        # single element lists are unwrapped, matching what trim_attributes did
+        lines = ['def decode(data, api=None):',
+                 '    instance = new(cls)',
+                 '    get = data.get']
+        for field, key in cls.schema:
+            lines.append('    value = get({!r})'.format(key))
+            if field in cls.references:
+                lines.append('    instance.{} = reference({!r}, value, api) if type(value) in nested else value'
+                             .format(field, cls.references[field]))
+            else:
+                lines.append('    instance.{} = value[0] if type(value) is list and len(value) == 1 else value'
+                             .format(field))
+        lines.append('    return instance')
+        namespace = {'new': object.__new__, 'cls': cls, 'reference': Reference.decode, 'nested': (list, dict)}
+        exec('\n'.join(lines), namespace)
+        return namespace['decode']
 
     @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('name', None),
-                   data.get('rating_board', None))
+    def decode_field(cls, field, value, api=None):
+        if field in cls.references:
+            return Reference.decode(cls.references[field], value, api)
+        return value[0] if type(value) is list and len(value) == 1 else value
+
+    def __init__(self, *args, **kwargs):
+        # positional arguments follow the __slots__ order, id can also be given as id_
+        for keyword, field in self.keywords.items():
+            if keyword in kwargs:
+                kwargs[field] = kwargs.pop(keyword)
+        unknown = set(kwargs).difference(self.__slots__)
+        if len(args) > len(self.__slots__) or unknown:
+            raise TypeError('Invalid arguments for {}: {}'.format(type(self).__name__, sorted(unknown)))
+        values = dict(zip(self.__slots__, args))
+        values.update(kwargs)
+        for field in self.__slots__:
+            setattr(self, field, self.decode_field(field, values.get(field)))
 
-    def __repr__(self):
-        return '{} {{{}}}'.format(self.name, self.id)
+    @classmethod
+    def from_dict(cls, data: dict, lazy=False, api=None):
+        if lazy:
+            instance = cls.__new__(cls)
+            instance.raw = data
+            instance.api = api
+            return instance
+        return cls.decode(data, api)
+
+    def update(self, data: dict, api=None):
+        # overwrites the fields present in data, fields missing from it keep their current value
+        for field, key in self.schema:
+            if key in data:
+                setattr(self, field, self.decode_field(field, data[key], api))
 
+    def __getattr__(self, name):
+        # only reached when a slot hasn't been set, which happens for fields of lazy instances
+        key = type(self).field_keys.get(name)
+        if key is None:
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+        value = self.decode_field(name, self.raw.get(key), self.api)
+        setattr(self, name, value)
+        return value
 
-class Genre:
-    def __init__(self,
-                 api_detail_url=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 id_=None,
-                 image=None,
-                 name=None,
-                 site_detail_url=None):
-        self.api_detail_url = api_detail_url
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.id = id_
-        self.image = image
-        self.name = name
-        self.site_detail_url = site_detail_url
 
-        Api.trim_attributes(self)
+def view(model, fields, name=None):
+    # a narrower model class holding only fields, requests made for it send the matching field_list
+    unknown = set(fields).difference(model.__slots__)
+    if unknown:
+        raise ApiError('Unknown fields for {}: {}'.format(model.__name__, sorted(unknown)))
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('name', None),
-                   data.get('site_detail_url', None))
+    def __repr__(self):
+        return '{} {{{}}}'.format(getattr(self, 'name', None), getattr(self, 'id', None))
+
+    return type(name if name is not None else model.__name__ + 'View', (Model,), {
+        '__slots__': tuple(fields),
+        '__module__': model.__module__,
+        '__repr__': __repr__,
+        'model': model,
+        'resource': model.resource,
+        'list_resource': model.list_resource,
+        'keys': {field: key for field, key in model.keys.items() if field in fields},
+        'references': {field: resource for field, resource in model.references.items() if field in fields},
+        'list_fields': tuple(field for field in model.list_fields if field in fields),
+        'field_list': [model.field_keys[field] for field in fields],
+    })
+
+
+class Accessory(Model):
+    resource = 'accessory'
+    list_resource = 'accessories'
+    __slots__ = ('api_detail_url', 'date_added', 'date_last_updated', 'deck', 'description', 'id', 'image', 'name',
+                 'site_detail_url')
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class Location:
-    def __init__(self,
-                 aliases=None,
-                 api_detail_url=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 first_appeared_in_game=None,
-                 id_=None,
-                 image=None,
-                 name=None,
-                 site_detail_url=None):
-        self.aliases = aliases
-        self.api_detail_url = api_detail_url
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.first_appeared_in_game = first_appeared_in_game
-        self.id = id_
-        self.image = image
-        self.name = name
-        self.site_detail_url = site_detail_url
-
-        Api.trim_attributes(self)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('aliases', None),
-                   data.get('api_detail_url', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('first_appeared_in_game', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('name', None),
-                   data.get('site_detail_url', None))
+class Character(Model):
+    resource = 'character'
+    list_resource = 'characters'
+    __slots__ = ('aliases', 'api_detail_url', 'birthday', 'concepts', 'date_added', 'date_last_updated', 'deck',
+                 'description', 'enemies', 'first_appeared_in_game', 'franchises', 'friends', 'games', 'gender', 'id',
+                 'image', 'last_name', 'locations', 'name', 'objects', 'people', 'real_name', 'site_detail_url')
+    references = {'concepts': 'concept', 'enemies': 'character', 'first_appeared_in_game': 'game',
+                  'franchises': 'franchise', 'friends': 'character', 'games': 'game', 'locations': 'location',
+                  'objects': 'object', 'people': 'person'}
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class Object:
-    def __init__(self,
-                 aliases=None,
-                 api_detail_url=None,
-                 characters=None,
-                 companies=None,
-                 concepts=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 first_appeared_in_game=None,
-                 franchises=None,
-                 games=None,
-                 id_=None,
-                 image=None,
-                 locations=None,
-                 name=None,
-                 objects=None,
-                 people=None,
-                 site_detail_url=None):
-        self.aliases = aliases
-        self.api_detail_url = api_detail_url
-        self.characters = characters
-        self.companies = companies
-        self.concepts = concepts
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.first_appeared_in_game = first_appeared_in_game
-        self.franchises = franchises
-        self.games = games
-        self.id = id_
-        self.image = image
-        self.locations = locations
-        self.name = name
-        self.objects = objects
-        self.people = people
-        self.site_detail_url = site_detail_url
+class Chat(Model):
+    resource = 'chat'
+    list_resource = 'chats'
+    __slots__ = ('api_detail_url', 'channel_name', 'deck', 'image', 'password', 'site_detail_url', 'title')
 
-        Api.trim_attributes(self)
+    def __repr__(self):
+        return '{} {{{}}}'.format(self.channel_name, self.title)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('aliases', None),
-                   data.get('api_detail_url', None),
-                   data.get('characters', None),
-                   data.get('companies', None),
-                   data.get('concepts', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('first_appeared_in_game', None),
-                   data.get('franchises', None),
-                   data.get('games', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('locations', None),
-                   data.get('name', None),
-                   data.get('objects', None),
-                   data.get('people', None),
-                   data.get('site_detail_url', None))
+
+class Company(Model):
+    resource = 'company'
+    list_resource = 'companies'
+    __slots__ = ('abbreviation', 'aliases', 'api_detail_url', 'characters', 'concepts', 'date_added', 'date_founded',
+                 'date_last_updated', 'deck', 'description', 'developed_games', 'developer_releases',
+                 'distributor_releases', 'id', 'image', 'location_address', 'location_city', 'location_country',
+                 'location_state', 'locations', 'name', 'objects', 'people', 'phone', 'published_games',
+                 'published_releases', 'site_detail_url', 'website')
+    references = {'characters': 'character', 'concepts': 'concept', 'developed_games': 'game',
+                  'developer_releases': 'release', 'distributor_releases': 'release', 'locations': 'location',
+                  'objects': 'object', 'people': 'person', 'published_games': 'game', 'published_releases': 'release'}
+    keywords = {'id_': 'id', 'publisher_releases': 'published_releases'}
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class Person:
-    def __init__(self,
-                 aliases=None,
-                 api_detail_url=None,
-                 birth_date=None,
-                 characters=None,
-                 concepts=None,
-                 country=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 death_date=None,
-                 deck=None,
-                 description=None,
-                 first_credited_game=None,
-                 franchises=None,
-                 games=None,
-                 gender=None,
-                 hometown=None,
-                 id_=None,
-                 image=None,
-                 locations=None,
-                 name=None,
-                 objects=None,
-                 people=None,
-                 site_detail_url=None):
-        self.aliases = aliases
-        self.api_detail_url = api_detail_url
-        self.birth_date = birth_date
-        self.characters = characters
-        self.concepts = concepts
-        self.country = country
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.death_date = death_date
-        self.deck = deck
-        self.description = description
-        self.first_credited_game = first_credited_game
-        self.franchises = franchises
-        self.games = games
-        self.gender = gender
-        self.hometown = hometown
-        self.id = id_
-        self.image = image
-        self.locations = locations
-        self.name = name
-        self.objects = objects
-        self.people = people
-        self.site_detail_url = site_detail_url
+class Concept(Model):
+    resource = 'concept'
+    list_resource = 'concepts'
+    __slots__ = ('aliases', 'api_detail_url', 'characters', 'concepts', 'date_added', 'date_last_updated', 'deck',
+                 'description', 'first_appeared_in_franchise', 'first_appeared_in_game', 'franchises', 'games', 'id',
+                 'image', 'locations', 'name', 'objects', 'people', 'related_concepts', 'site_detail_url')
+    references = {'characters': 'character', 'concepts': 'concept', 'first_appeared_in_franchise': 'franchise',
+                  'first_appeared_in_game': 'game', 'franchises': 'franchise', 'games': 'game', 'locations': 'location',
+                  'objects': 'object', 'people': 'person', 'related_concepts': 'concept'}
 
-        Api.trim_attributes(self)
+    def __repr__(self):
+        return '{} {{{}}}'.format(self.name, self.id)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('aliases', None),
-                   data.get('api_detail_url', None),
-                   data.get('birth_date', None),
-                   data.get('characters', None),
-                   data.get('concepts', None),
-                   data.get('country', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('death_date', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('first_credited_game', None),
-                   data.get('franchises', None),
-                   data.get('games', None),
-                   data.get('gender', None),
-                   data.get('hometown', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('locations', None),
-                   data.get('name', None),
-                   data.get('objects', None),
-                   data.get('people', None),
-                   data.get('site_detail_url', None))
+
+class Franchise(Model):
+    resource = 'franchise'
+    list_resource = 'franchises'
+    __slots__ = ('aliases', 'api_detail_url', 'characters', 'concepts', 'date_added', 'date_last_updated', 'deck',
+                 'description', 'games', 'id', 'image', 'locations', 'name', 'objects', 'people', 'site_detail_url')
+    references = {'characters': 'character', 'concepts': 'concept', 'games': 'game', 'locations': 'location',
+                  'objects': 'object', 'people': 'person'}
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class Platform:
-    def __init__(self,
-                 abbreviation=None,
-                 api_detail_url=None,
-                 company=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 id_=None,
-                 image=None,
-                 install_base=None,
-                 name=None,
-                 online_support=None,
-                 original_price=None,
-                 release_date=None,
-                 site_detail_url=None):
-        self.abbreviation = abbreviation
-        self.api_detail_url = api_detail_url
-        self.company = company
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.id = id_
-        self.image = image
-        self.install_base = install_base
-        self.name = name
-        self.online_support = online_support
-        self.original_price = original_price
-        self.release_date = release_date
-        self.site_detail_url = site_detail_url
+class Game(Model):
+    resource = 'game'
+    list_resource = 'games'
+    __slots__ = ('aliases', 'api_detail_url', 'characters', 'concepts', 'date_added', 'date_last_updated', 'deck',
+                 'description', 'developers', 'expected_release_day', 'expected_release_month',
+                 'expected_release_quarter', 'expected_release_year', 'first_appearance_characters',
+                 'first_appearance_concepts', 'first_appearance_locations', 'first_appearance_objects',
+                 'first_appearance_people', 'franchises', 'genres', 'id', 'image', 'images', 'killed_characters',
+                 'locations', 'name', 'number_of_user_reviews', 'objects', 'original_game_rating',
+                 'original_release_date', 'people', 'platforms', 'publishers', 'releases', 'reviews', 'similar_games',
+                 'site_detail_url', 'themes', 'videos')
+    references = {'characters': 'character', 'concepts': 'concept', 'developers': 'company',
+                  'first_appearance_characters': 'character', 'first_appearance_concepts': 'concept',
+                  'first_appearance_locations': 'location', 'first_appearance_objects': 'object',
+                  'first_appearance_people': 'person', 'franchises': 'franchise', 'genres': 'genre',
+                  'killed_characters': 'character', 'locations': 'location', 'objects': 'object',
+                  'original_game_rating': 'game_rating', 'people': 'person', 'platforms': 'platform',
+                  'publishers': 'company', 'releases': 'release', 'reviews': 'review', 'similar_games': 'game',
+                  'themes': 'theme', 'videos': 'video'}
+    list_fields = ('aliases', 'api_detail_url', 'date_added', 'date_last_updated', 'deck', 'description',
+                   'expected_release_day', 'expected_release_month', 'expected_release_quarter',
+                   'expected_release_year', 'id', 'image', 'name', 'number_of_user_reviews', 'original_game_rating',
+                   'original_release_date', 'platforms', 'site_detail_url')
 
-        Api.trim_attributes(self)
+    def __repr__(self):
+        return '{} {{{}}}'.format(self.name, self.id)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('abbreviation', None),
-                   data.get('api_detail_url', None),
-                   data.get('company', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('install_base', None),
-                   data.get('name', None),
-                   data.get('online_support', None),
-                   data.get('original_price', None),
-                   data.get('release_date', None),
-                   data.get('site_detail_url', None))
+
+class GameRating(Model):
+    resource = 'game_rating'
+    list_resource = 'game_ratings'
+    __slots__ = ('api_detail_url', 'id', 'image', 'name', 'rating_board')
+    references = {'rating_board': 'rating_board'}
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class Promo:
-    def __init__(self,
-                 api_detail_url=None,
-                 date_added=None,
-                 deck=None,
-                 id_=None,
-                 image=None,
-                 link=None,
-                 name=None,
-                 resource_type=None,
-                 user=None):
-        self.api_detail_url = api_detail_url
-        self.date_added = date_added
-        self.deck = deck
-        self.id = id_
-        self.image = image
-        self.link = link
-        self.name = name
-        self.resource_type = resource_type
-        self.user = user
+class Genre(Model):
+    resource = 'genre'
+    list_resource = 'genres'
+    __slots__ = ('api_detail_url', 'date_added', 'date_last_updated', 'deck', 'description', 'id', 'image', 'name',
+                 'site_detail_url')
 
-        Api.trim_attributes(self)
+    def __repr__(self):
+        return '{} {{{}}}'.format(self.name, self.id)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('date_added', None),
-                   data.get('deck', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('link', None),
-                   data.get('name', None),
-                   data.get('resource_type', None),
-                   data.get('user', None))
+
+class Location(Model):
+    resource = 'location'
+    list_resource = 'locations'
+    __slots__ = ('aliases', 'api_detail_url', 'date_added', 'date_last_updated', 'deck', 'description',
+                 'first_appeared_in_game', 'id', 'image', 'name', 'site_detail_url')
+    references = {'first_appeared_in_game': 'game'}
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class RatingBoard:
-    def __init__(self,
-                 api_detail_url=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 id_=None,
-                 image=None,
-                 name=None,
-                 region=None,
-                 site_detail_url=None):
-        self.api_detail_url = api_detail_url
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.id = id_
-        self.image = image
-        self.name = name
-        self.region = region
-        self.site_detail_url = site_detail_url
+class Object(Model):
+    resource = 'object'
+    list_resource = 'objects'
+    __slots__ = ('aliases', 'api_detail_url', 'characters', 'companies', 'concepts', 'date_added', 'date_last_updated',
+                 'deck', 'description', 'first_appeared_in_game', 'franchises', 'games', 'id', 'image', 'locations',
+                 'name', 'objects', 'people', 'site_detail_url')
+    references = {'characters': 'character', 'companies': 'company', 'concepts': 'concept',
+                  'first_appeared_in_game': 'game', 'franchises': 'franchise', 'games': 'game', 'locations': 'location',
+                  'objects': 'object', 'people': 'person'}
 
-        Api.trim_attributes(self)
+    def __repr__(self):
+        return '{} {{{}}}'.format(self.name, self.id)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('name', None),
-                   data.get('region', None),
-                   data.get('site_detail_url', None))
+
+class Person(Model):
+    resource = 'person'
+    list_resource = 'people'
+    __slots__ = ('aliases', 'api_detail_url', 'birth_date', 'characters', 'concepts', 'country', 'date_added',
+                 'date_last_updated', 'death_date', 'deck', 'description', 'first_credited_game', 'franchises', 'games',
+                 'gender', 'hometown', 'id', 'image', 'locations', 'name', 'objects', 'people', 'site_detail_url')
+    references = {'characters': 'character', 'concepts': 'concept', 'first_credited_game': 'game',
+                  'franchises': 'franchise', 'games': 'game', 'locations': 'location', 'objects': 'object',
+                  'people': 'person'}
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class Region:
-    def __init__(self,
-                 api_detail_url=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 id_=None,
-                 image=None,
-                 name=None,
-                 rating_boards=None,
-                 site_detail_url=None):
-        self.api_detail_url = api_detail_url
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.id = id_
-        self.image = image
-        self.name = name
-        self.rating_boards = rating_boards
-        self.site_detail_url = site_detail_url
+class Platform(Model):
+    resource = 'platform'
+    list_resource = 'platforms'
+    __slots__ = ('abbreviation', 'api_detail_url', 'company', 'date_added', 'date_last_updated', 'deck', 'description',
+                 'id', 'image', 'install_base', 'name', 'online_support', 'original_price', 'release_date',
+                 'site_detail_url')
+    references = {'company': 'company'}
 
-        Api.trim_attributes(self)
+    def __repr__(self):
+        return '{} {{{}}}'.format(self.name, self.id)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('name', None),
-                   data.get('rating_boards', None),
-                   data.get('site_detail_url', None))
+
+class Promo(Model):
+    resource = 'promo'
+    list_resource = 'promos'
+    __slots__ = ('api_detail_url', 'date_added', 'deck', 'id', 'image', 'link', 'name', 'resource_type', 'user')
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class Release:
-    def __init__(self,
-                 api_detail_url=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 developers=None,
-                 expected_release_day=None,
-                 expected_release_month=None,
-                 expected_release_quarter=None,
-                 expected_release_year=None,
-                 game=None,
-                 game_rating=None,
-                 id_=None,
-                 image=None,
-                 images=None,
-                 maximum_players=None,
-                 minimum_players=None,
-                 name=None,
-                 platform=None,
-                 product_code_type=None,
-                 product_code_value=None,
-                 publishers=None,
-                 region=None,
-                 release_date=None,
-                 resolutions=None,
-                 singleplayer_features=None,
-                 sound_systems=None,
-                 site_detail_url=None,
-                 widescreen_support=None):
-        self.api_detail_url = api_detail_url
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.developers = developers
-        self.expected_release_day = expected_release_day
-        self.expected_release_month = expected_release_month
-        self.expected_release_quarter = expected_release_quarter
-        self.expected_release_year = expected_release_year
-        self.game = game
-        self.game_rating = game_rating
-        self.id = id_
-        self.image = image
-        self.images = images
-        self.maximum_players = maximum_players
-        self.minimum_players = minimum_players
-        self.name = name
-        self.platform = platform
-        self.product_code_type = product_code_type
-        self.product_code_value = product_code_value
-        self.publishers = publishers
-        self.region = region
-        self.release_date = release_date
-        self.resolutions = resolutions
-        self.singleplayer_features = singleplayer_features
-        self.sound_systems = sound_systems
-        self.site_detail_url = site_detail_url
-        self.widescreen_support = widescreen_support
+class RatingBoard(Model):
+    resource = 'rating_board'
+    list_resource = 'rating_boards'
+    __slots__ = ('api_detail_url', 'date_added', 'date_last_updated', 'deck', 'description', 'id', 'image', 'name',
+                 'region', 'site_detail_url')
+    references = {'region': 'region'}
 
-        Api.trim_attributes(self)
+    def __repr__(self):
+        return '{} {{{}}}'.format(self.name, self.id)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('developers', None),
-                   data.get('expected_release_day', None),
-                   data.get('expected_release_month', None),
-                   data.get('expected_release_quarter', None),
-                   data.get('expected_release_year', None),
-                   data.get('game', None),
-                   data.get('game_rating', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('images', None),
-                   data.get('maximum_players', None),
-                   data.get('minimum_players', None),
-                   data.get('name', None),
-                   data.get('platform', None),
-                   data.get('product_code_type', None),
-                   data.get('product_code_value', None),
-                   data.get('publishers', None),
-                   data.get('region', None),
-                   data.get('release_date', None),
-                   data.get('resolutions', None),
-                   data.get('singleplayer_features', None),
-                   data.get('sound_systems', None),
-                   data.get('site_detail_url', None),
-                   data.get('widescreen_support', None))
+
+class Region(Model):
+    resource = 'region'
+    list_resource = 'regions'
+    __slots__ = ('api_detail_url', 'date_added', 'date_last_updated', 'deck', 'description', 'id', 'image', 'name',
+                 'rating_boards', 'site_detail_url')
+    references = {'rating_boards': 'rating_board'}
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class Review:
-    def __init__(self,
-                 api_detail_url=None,
-                 deck=None,
-                 description=None,
-                 dlc_name=None,
-                 game=None,
-                 platforms=None,
-                 publish_date=None,
-                 release=None,
-                 reviewer=None,
-                 score=None,
-                 site_detail_url=None):
-        self.api_detail_url = api_detail_url
-        self.deck = deck
-        self.description = description
-        self.dlc_name = dlc_name
-        self.game = game
-        self.platforms = platforms
-        self.publish_date = publish_date
-        self.release = release
-        self.reviewer = reviewer
-        self.score = score
-        self.site_detail_url = site_detail_url
+class Release(Model):
+    resource = 'release'
+    list_resource = 'releases'
+    __slots__ = ('api_detail_url', 'date_added', 'date_last_updated', 'deck', 'description', 'developers',
+                 'expected_release_day', 'expected_release_month', 'expected_release_quarter', 'expected_release_year',
+                 'game', 'game_rating', 'id', 'image', 'images', 'maximum_players', 'minimum_players', 'name',
+                 'platform', 'product_code_type', 'product_code_value', 'publishers', 'region', 'release_date',
+                 'resolutions', 'singleplayer_features', 'sound_systems', 'site_detail_url', 'widescreen_support')
+    references = {'developers': 'company', 'game': 'game', 'game_rating': 'game_rating', 'platform': 'platform',
+                  'publishers': 'company', 'region': 'region'}
 
-        Api.trim_attributes(self)
+    def __repr__(self):
+        return '{} {{{}}}'.format(self.name, self.id)
 
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('dlc_name', None),
-                   data.get('game', None),
-                   data.get('platforms', None),
-                   data.get('publish_date', None),
-                   data.get('release', None),
-                   data.get('reviewer', None),
-                   data.get('score', None),
-                   data.get('site_detail_url', None))
+
+class Review(Model):
+    resource = 'review'
+    list_resource = 'reviews'
+    __slots__ = ('api_detail_url', 'deck', 'description', 'dlc_name', 'game', 'platforms', 'publish_date', 'release',
+                 'reviewer', 'score', 'site_detail_url')
+    references = {'game': 'game', 'release': 'release'}
 
     def __repr__(self):
         return '{} Review by {}: {}'.format(self.game, self.reviewer, self.score)
 
 
 class SearchResults:
+    __slots__ = ('games', 'franchises', 'characters', 'concepts', 'objects', 'locations', 'people', 'companies',
+                 'videos')
+
     def __init__(self,
                  games=None,
                  franchises=None,
@@ -1500,223 +2296,68 @@ class SearchResults:
                                    len(self.videos))
 
 
-class Theme:
-    def __init__(self,
-                 api_detail_url=None,
-                 id_=None,
-                 name=None,
-                 site_detail_url=None):
-        self.api_detail_url = api_detail_url
-        self.id = id_
-        self.name = name
-        self.site_detail_url = site_detail_url
-
-        Api.trim_attributes(self)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('id', None),
-                   data.get('name', None),
-                   data.get('site_detail_url', None))
+class Theme(Model):
+    resource = 'theme'
+    list_resource = 'themes'
+    __slots__ = ('api_detail_url', 'id', 'name', 'site_detail_url')
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class Types:
-    def __init__(self,
-                 detail_resource_name=None,
-                 id_=None,
-                 list_resource_name=None):
-        self.detail_resource_name = detail_resource_name
-        self.id = id_
-        self.list_resource_name = list_resource_name
-
-        Api.trim_attributes(self)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('detail_resource_name', None),
-                   data.get('id', None),
-                   data.get('list_resource_name', None))
+class Types(Model):
+    resource = 'types'
+    list_resource = None
+    __slots__ = ('detail_resource_name', 'id', 'list_resource_name')
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.list_resource_name, self.id)
 
 
-class UserReview:
-    def __init__(self,
-                 api_detail_url=None,
-                 date_added=None,
-                 date_last_updated=None,
-                 deck=None,
-                 description=None,
-                 game=None,
-                 reviewer=None,
-                 score=None,
-                 site_detail_url=None):
-        self.api_detail_url = api_detail_url
-        self.date_added = date_added
-        self.date_last_updated = date_last_updated
-        self.deck = deck
-        self.description = description
-        self.game = game
-        self.reviewer = reviewer
-        self.score = score
-        self.site_detail_url = site_detail_url
-
-        Api.trim_attributes(self)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('date_added', None),
-                   data.get('date_last_updated', None),
-                   data.get('deck', None),
-                   data.get('description', None),
-                   data.get('wikiObject', None),
-                   data.get('reviewer', None),
-                   data.get('score', None),
-                   data.get('site_detail_url', None))
+class UserReview(Model):
+    resource = 'user_review'
+    list_resource = 'user_reviews'
+    __slots__ = ('api_detail_url', 'date_added', 'date_last_updated', 'deck', 'description', 'game', 'reviewer',
+                 'score', 'site_detail_url')
+    keys = {'game': 'wikiObject'}
+    references = {'game': 'game'}
 
     def __repr__(self):
         return '{} Review by {}: {}'.format(self.game, self.reviewer, self.score)
 
 
-class Video:
-    def __init__(self,
-                 api_detail_url=None,
-                 deck=None,
-                 hd_url=None,
-                 high_url=None,
-                 low_url=None,
-                 embed_player=None,
-                 id_=None,
-                 image=None,
-                 length_seconds=None,
-                 name=None,
-                 publish_date=None,
-                 site_detail_url=None,
-                 url=None,
-                 user=None,
-                 youtube_id=None):
-        self.api_detail_url = api_detail_url
-        self.deck = deck
-        self.hd_url = hd_url
-        self.high_url = high_url
-        self.low_url = low_url
-        self.embed_player = embed_player
-        self.id = id_
-        self.image = image
-        self.length_seconds = length_seconds
-        self.name = name
-        self.publish_date = publish_date
-        self.site_detail_url = site_detail_url
-        self.url = url
-        self.user = user
-        self.youtube_id = youtube_id
-
-        Api.trim_attributes(self)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('deck', None),
-                   data.get('hd_url', None),
-                   data.get('high_url', None),
-                   data.get('low_url', None),
-                   data.get('embed_player', None),
-                   data.get('id', None),
-                   data.get('image', None),
-                   data.get('length_seconds', None),
-                   data.get('name', None),
-                   data.get('publish_date', None),
-                   data.get('site_detail_url', None),
-                   data.get('url', None),
-                   data.get('user', None),
-                   data.get('youtube_id', None))
+class Video(Model):
+    resource = 'video'
+    list_resource = 'videos'
+    __slots__ = ('api_detail_url', 'deck', 'hd_url', 'high_url', 'low_url', 'embed_player', 'id', 'image',
+                 'length_seconds', 'name', 'publish_date', 'site_detail_url', 'url', 'user', 'youtube_id')
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class VideoType:
-    def __init__(self,
-                 api_detail_url=None,
-                 deck=None,
-                 id_=None,
-                 name=None,
-                 site_detail_url=None):
-        self.api_detail_url = api_detail_url
-        self.deck = deck
-        self.id = id_
-        self.name = name
-        self.site_detail_url = site_detail_url
-
-        Api.trim_attributes(self)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('deck', None),
-                   data.get('id', None),
-                   data.get('name', None),
-                   data.get('site_detail_url', None))
+class VideoType(Model):
+    resource = 'video_type'
+    list_resource = 'video_types'
+    __slots__ = ('api_detail_url', 'deck', 'id', 'name', 'site_detail_url')
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class VideoCategory:
-    def __init__(self,
-                 api_detail_url=None,
-                 deck=None,
-                 id_=None,
-                 name=None,
-                 site_detail_url=None):
-        self.api_detail_url = api_detail_url
-        self.deck = deck
-        self.id = id_
-        self.name = name
-        self.site_detail_url = site_detail_url
-
-        Api.trim_attributes(self)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('deck', None),
-                   data.get('id', None),
-                   data.get('name', None),
-                   data.get('site_detail_url', None))
+class VideoCategory(Model):
+    resource = 'video_category'
+    list_resource = 'video_categories'
+    __slots__ = ('api_detail_url', 'deck', 'id', 'name', 'site_detail_url')
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
 
 
-class VideoShow:
-    def __init__(self,
-                 api_detail_url=None,
-                 deck=None,
-                 id_=None,
-                 name=None,
-                 site_detail_url=None):
-        self.api_detail_url = api_detail_url
-        self.deck = deck
-        self.id = id_
-        self.name = name
-        self.site_detail_url = site_detail_url
-
-        Api.trim_attributes(self)
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        return cls(data.get('api_detail_url', None),
-                   data.get('deck', None),
-                   data.get('id', None),
-                   data.get('name', None),
-                   data.get('site_detail_url', None))
+class VideoShow(Model):
+    resource = 'video_show'
+    list_resource = 'video_shows'
+    __slots__ = ('api_detail_url', 'deck', 'id', 'name', 'site_detail_url')
 
     def __repr__(self):
         return '{} {{{}}}'.format(self.name, self.id)
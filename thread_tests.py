@@ -0,0 +1,383 @@
+import asyncio
+import giantbomb
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+
+requests_by_key = {}
+requests_lock = threading.Lock()
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        api_key = self.path.split('api_key=')[1].split('&')[0]
+        with requests_lock:
+            requests_by_key.setdefault(api_key, []).append(time.monotonic())
+            count = len(requests_by_key[api_key])
+        query = dict(urllib.parse.parse_qsl(self.path.split('?', 1)[1]))
+        if api_key == 'coalesce_key':
+            time.sleep(0.2)
+        path = self.path.split('?')[0].strip('/').split('/')
+        if path[-1] == 'games' and 'filter=id' in self.path:
+            # a list endpoint filtered by id, game 404 doesn't exist and asking for game 500 fails the whole request
+            ids = self.path.split('filter=id%3A')[1].split('&')[0].split('%7C')
+            keys = self.path.split('field_list=')[1].split('&')[0].split('%2C')
+            results = [{'id': int(id_), 'name': 'Game {}'.format(id_), 'platforms': [{'id': 94, 'name': 'PC'}],
+                        'api_detail_url': 'http://www.giantbomb.com/api/game/3030-{}/'.format(id_)}
+                       for id_ in ids if id_ != '404']
+            # like the real list endpoints, every requested key they support is there even when it is empty
+            results = [{key: result.get(key) for key in keys if key in giantbomb.Game.list_keys} for result in results]
+            response = {'status_code': 1, 'number_of_page_results': len(results),
+                        'number_of_total_results': len(results), 'results': results}
+            if '500' in ids:
+                response = {'status_code': 100, 'results': []}
+        elif path[-1] in ('games', 'search'):
+            # 25 games, paged by offset or, for search, by page
+            limit = int(query['limit'])
+            offset = (int(query['page']) - 1) * limit if 'page' in query else int(query.get('offset', 0))
+            results = [{'id': id_, 'name': 'Game {}'.format(id_), 'resource_type': 'game',
+                        'number_of_user_reviews': 2.5, 'image': {'icon_url': 'icon.png'},
+                        'platforms': [{'id': 94, 'name': 'PC'}, {'id': 145}]}
+                       for id_ in range(offset, min(offset + limit, 25))]
+            response = {'status_code': 1, 'number_of_page_results': len(results), 'number_of_total_results': 25,
+                        'results': results}
+            if api_key in ('limited_key', 'async_limited_key') and count % 2:
+                # every other request is rejected for going over the velocity limit
+                response = {'status_code': 107, 'number_of_total_results': 0, 'results': []}
+            elif api_key == 'failing_key' or (api_key == 'broken_key' and offset >= 10):
+                response['status_code'] = 100
+            elif api_key == 'late_key':
+                # the status comes after the results, so they have been handed out by the time it is checked
+                response = {'results': results, 'status_code': 107}
+        elif path[-1] == '3030-404':
+            response = {'status_code': 101, 'results': []}
+        elif path[-1] == '3030-13':
+            # a malformed payload, missing its results
+            response = {'status_code': 1}
+        else:
+            response = {'status_code': 1, 'results': {'id': 1, 'name': 'Test name',
+                                                      'developers': [{'id': 1, 'name': 'Developer'}]}}
+        body = json.dumps(response).encode()
+        if api_key == 'throttled_key':
+            self.send_response(429)
+            self.send_header('Retry-After', '3')
+            body = b'Too Many Requests'
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base_url = 'http://127.0.0.1:{}/api/'.format(server.server_port)
+
+
+class RecordingRateLimiter(giantbomb.RateLimiter):
+    # keeps the time every token was handed out, taken inside the limiter so thread scheduling doesn't blur it
+    def __init__(self, rate=1.0, burst=1):
+        super().__init__(rate, burst)
+        self.grants = []
+        self.recording = threading.Lock()
+
+    def try_acquire(self):
+        with self.recording:
+            wait = super().try_acquire()
+            if wait <= 0:
+                self.grants.append(self.last_time)
+            return wait
+
+
+def hammer(api, thread_count, calls):
+    errors = []
+
+    def work(n):
+        try:
+            # every thread asks for its own ids, identical requests in flight would be coalesced into one
+            for i in range(calls):
+                api.get_game(n * calls + i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(thread_count)]
+    return threads, errors
+
+
+fast = giantbomb.Api('fast_key', 'test_app/0.1', delay=10)
+slow = giantbomb.Api('slow_key', 'test_app/0.1', delay=50)
+fast.base_url = slow.base_url = base_url
+fast.transport.rate_limiter = RecordingRateLimiter.from_delay(10)
+slow.transport.rate_limiter = RecordingRateLimiter.from_delay(50)
+
+fast_threads, fast_errors = hammer(fast, 16, 10)
+slow_threads, slow_errors = hammer(slow, 8, 3)
+for thread in fast_threads + slow_threads:
+    thread.start()
+for thread in fast_threads + slow_threads:
+    thread.join()
+
+assert not fast_errors and not slow_errors
+assert len(requests_by_key['fast_key']) == 160
+assert len(requests_by_key['slow_key']) == 24
+
+# each key keeps to its own delay no matter how many threads or other Apis are sending requests
+for api, delay in ((fast, 0.010), (slow, 0.050)):
+    times = api.transport.rate_limiter.grants
+    assert len(times) == len(requests_by_key[api.api_key])
+    assert min(b - a for a, b in zip(times, times[1:])) >= delay * 0.99
+
+assert giantbomb.Request.for_key('fast_key') is fast.transport
+assert fast.transport is not slow.transport
+# looking a transport up, or making an Api with its own limiter for the same key, leaves the key's delay alone
+assert fast.transport.delay == 10
+giantbomb.Api('fast_key', 'test_app/0.1', delay=200, rate_limiter=giantbomb.RateLimiter(5))
+assert fast.transport.delay == 10
+assert giantbomb.Request.for_key('unused_key') is None
+giantbomb.Api('fast_key', 'test_app/0.1', delay=20)
+assert fast.transport.delay == 20
+
+# identical lookups made at the same moment share a single request and a single result
+coalescing = giantbomb.Api('coalesce_key', 'test_app/0.1', delay=10)
+coalescing.base_url = base_url
+barrier = threading.Barrier(8)
+results = []
+
+
+def lookup():
+    barrier.wait()
+    results.append(coalescing.get_game('3030-1'))
+
+
+threads = [threading.Thread(target=lookup) for _ in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+
+assert len(results) == 8
+assert len(requests_by_key['coalesce_key']) == 1
+assert all(result.name == 'Test name' for result in results)
+assert coalescing.metrics.snapshot()['game/{id}']['coalesced'] == 7
+assert not coalescing.flights.calls
+
+# once the first request is done the next lookup goes out again
+coalescing.get_game('3030-1')
+assert len(requests_by_key['coalesce_key']) == 2
+
+# interactive lookups jump ahead of a queued bulk crawl sharing the same budget, the crawl gets the rest
+scheduler = giantbomb.Scheduler(RecordingRateLimiter.from_delay(20))
+crawler = giantbomb.Api('background_key', 'test_app/0.1', rate_limiter=scheduler.bind('background'))
+frontend = giantbomb.Api('interactive_key', 'test_app/0.1', rate_limiter=scheduler.bind('interactive'))
+crawler.base_url = frontend.base_url = base_url
+
+crawl_threads, crawl_errors = hammer(crawler, 4, 10)
+for thread in crawl_threads:
+    thread.start()
+time.sleep(0.2)
+start = time.monotonic()
+for i in range(5):
+    frontend.get_game(i)
+elapsed = time.monotonic() - start
+for thread in crawl_threads:
+    thread.join()
+
+assert not crawl_errors
+assert scheduler.granted == {'interactive': 5, 'background': 40}
+# in arrival order the first lookup alone would wait behind ~30 queued crawl requests
+assert elapsed < 0.4
+times = scheduler.rate_limiter.grants
+assert len(times) == 45
+assert min(b - a for a, b in zip(times, times[1:])) >= 0.020 * 0.99
+
+with scheduler.priority('background'):
+    assert scheduler.current.get() == 'background'
+assert scheduler.current.get() is None
+
+# the class is carried onto the worker threads bulk lookups and prefetching send their requests from
+shared = giantbomb.Api('priority_key', 'test_app/0.1', rate_limiter=scheduler)
+shared.base_url = base_url
+with scheduler.priority('background'):
+    assert all(result.ok for result in shared.get_many('game', ['3030-1', '3030-2', '3030-3']))
+    assert len(list(shared.iter_games(limit=10, prefetch=2))) == 25
+assert scheduler.granted == {'interactive': 5, 'background': 46}
+shared.get_game('3030-4')
+assert scheduler.granted == {'interactive': 6, 'background': 46}
+try:
+    scheduler.bind('nightly')
+    assert False
+except giantbomb.ApiError:
+    pass
+
+# batched lookups go through the list endpoint 100 ids at a time, only the fields it doesn't return cost a request
+batching = giantbomb.Api('batch_key', 'test_app/0.1', delay=1)
+batching.base_url = base_url
+ids = ['3030-{}'.format(id_) for id_ in range(250)] + [250, '3030-404']
+results = list(batching.get_batch('game', ids))
+assert len(requests_by_key['batch_key']) == 4
+assert [result.id for result in results] == ids
+assert all(result.ok for result in results[:-1]) and not results[-1].ok
+assert results[3].result.name == 'Game 3' and results[3].result.platforms[0].id == 94
+
+results = list(batching.get_batch(giantbomb.Game, ids[:3], field_list=['id', 'name', 'developers']))
+assert len(requests_by_key['batch_key']) == 8
+assert all(result.result.developers[0].name == 'Developer' for result in results)
+assert results[0].result.name == 'Game 0'
+
+# results come out chunk by chunk, a failed chunk puts its error on each of its ids and the batch carries on
+batch = batching.get_batch('game', [1, 2, 500, 3, 4, 5], chunk_size=2)
+assert next(batch).result.name == 'Game 1'
+assert len(requests_by_key['batch_key']) == 9
+results = [next(batch)] + list(batch)
+assert len(requests_by_key['batch_key']) == 11
+assert [result.ok for result in results] == [True, False, False, True, True]
+assert results[1].error is results[2].error and isinstance(results[1].error, giantbomb.ApiError)
+
+assert giantbomb.Api.numeric_id('3030-12') == giantbomb.Api.numeric_id(12) == 12
+assert giantbomb.Api.numeric_id('abc') is None
+
+# streamed list pages are parsed result by result, nested objects and the top level scalars included
+streaming = giantbomb.Api('stream_key', 'test_app/0.1', delay=1)
+streaming.base_url = base_url
+games = list(streaming.iter_games(limit=10, stream=True))
+assert [game.id for game in games] == list(range(25))
+assert len(requests_by_key['stream_key']) == 3
+assert games[0].platforms == [giantbomb.Reference('platform', 94), giantbomb.Reference('platform', 145)]
+assert games[0].image == {'icon_url': 'icon.png'}
+assert games[0].number_of_user_reviews == 2.5
+
+summary = {}
+assert len(list(streaming.stream(base_url + 'games/', {'limit': '5', 'offset': '0'}, summary))) == 5
+assert summary['status_code'] == 1 and summary['number_of_total_results'] == 25
+
+# a velocity violation reported before any result is retried, one reported after results went out is not
+limited = giantbomb.Api('limited_key', 'test_app/0.1', delay=1)
+limited.base_url = base_url
+assert len(list(limited.iter_games(stream=True))) == 25
+assert len(requests_by_key['limited_key']) == 2
+assert limited.metrics.snapshot()['games/']['retries'] == 1
+
+late = giantbomb.Api('late_key', 'test_app/0.1', delay=1)
+late.base_url = base_url
+seen = []
+try:
+    for game in late.iter_games(stream=True):
+        seen.append(game)
+    assert False
+except giantbomb.RateLimitError:
+    pass
+assert len(seen) == 25
+assert len(requests_by_key['late_key']) == 1
+
+# any other status stops the stream before a single result is handed out
+failing = giantbomb.Api('failing_key', 'test_app/0.1', delay=1)
+failing.base_url = base_url
+seen = []
+try:
+    for game in failing.iter_games(stream=True):
+        seen.append(game)
+    assert False
+except giantbomb.ApiError:
+    pass
+assert not seen
+assert len(requests_by_key['failing_key']) == 1
+
+results = list(streaming.search_all('test', limit=10, stream=True))
+assert [result.id for result in results] == list(range(25))
+assert all(isinstance(result, giantbomb.Game) for result in results)
+assert len(requests_by_key['stream_key']) == 7
+
+# prefetched pages are read ahead on a background thread, in order and without extra requests
+paging = giantbomb.Api('paging_key', 'test_app/0.1', delay=1)
+paging.base_url = base_url
+assert [game.id for game in paging.iter_games(limit=10, prefetch=2)] == list(range(25))
+assert len(requests_by_key['paging_key']) == 3
+
+
+def producers():
+    return [thread for thread in threading.enumerate() if 'produce' in thread.name]
+
+
+# a consumer that stops early stops the producer, which reads at most depth pages ahead plus one waiting to be queued
+games = paging.iter_games(limit=1, prefetch=2)
+assert [next(games).id for _ in range(3)] == [0, 1, 2]
+games.close()
+time.sleep(0.5)
+requested = len(requests_by_key['paging_key'])
+assert 3 + 3 <= requested <= 3 + 3 + 3
+assert not producers()
+time.sleep(0.2)
+assert len(requests_by_key['paging_key']) == requested
+
+# an error on the producer thread is raised in the consumer once the pages before it are used up
+broken = giantbomb.Api('broken_key', 'test_app/0.1', delay=1)
+broken.base_url = base_url
+seen = []
+try:
+    for game in broken.iter_games(limit=10, prefetch=2):
+        seen.append(game.id)
+    assert False
+except giantbomb.ApiError:
+    pass
+assert seen == list(range(10))
+assert len(requests_by_key['broken_key']) == 2
+
+# search_all requests as many pages as number_of_total_results, or max_results, calls for and no more
+searching = giantbomb.Api('search_key', 'test_app/0.1', delay=1)
+searching.base_url = base_url
+assert [result.id for result in searching.search_all('test', limit=10)] == list(range(25))
+assert len(requests_by_key['search_key']) == 3
+assert [result.id for result in searching.search_all('test', max_results=20, limit=10)] == list(range(20))
+assert len(requests_by_key['search_key']) == 5
+assert [result.id for result in searching.search_all('test', max_results=15, limit=10, prefetch=2)] == list(range(15))
+assert len(requests_by_key['search_key']) == 7
+assert len(list(searching.search_all('test', max_results=15, limit=10, stream=True))) == 15
+assert len(requests_by_key['search_key']) == 9
+
+
+# the async client against the same stub, identical lookups in flight share one request
+async def async_lookups():
+    async with giantbomb.AsyncApi('async_key', 'test_app/0.1', delay=1) as api:
+        api.base_url = base_url
+        games = await asyncio.gather(*(api.get_game('3030-1') for _ in range(5)))
+        assert [game.name for game in games] == ['Test name'] * 5
+        assert len(requests_by_key['async_key']) == 1
+        assert not api.flights
+
+        search = await api.search('test', limit=10)
+        assert [game.id for game in search.games] == list(range(10))
+        assert len(requests_by_key['async_key']) == 2
+
+    # a velocity violation is retried after backing off, once the retries run out it is raised
+    async with giantbomb.AsyncApi('async_limited_key', 'test_app/0.1', delay=1) as api:
+        api.base_url = base_url
+        search = await api.search('test', limit=10)
+        assert [game.id for game in search.games] == list(range(10))
+        assert len(requests_by_key['async_limited_key']) == 2
+
+    async with giantbomb.AsyncApi('throttled_key', 'test_app/0.1', delay=1, rate_limit_retries=0) as api:
+        api.base_url = base_url
+        try:
+            await api.get_game('3030-1')
+            assert False
+        except giantbomb.RateLimitError as e:
+            assert e.retry_after == 3
+        assert len(requests_by_key['throttled_key']) == 1
+
+
+asyncio.run(async_lookups())
+
+# in a bulk lookup every id gets its own result, one that fails doesn't take the others down with it
+bulk = giantbomb.Api('bulk_key', 'test_app/0.1', delay=1)
+bulk.base_url = base_url
+results = list(bulk.get_many('game', ['3030-1', '3030-13', '3030-404', '3030-2']))
+assert [result.id for result in results] == ['3030-1', '3030-13', '3030-404', '3030-2']
+assert [result.ok for result in results] == [True, False, False, True]
+assert isinstance(results[1].error, KeyError) and isinstance(results[2].error, giantbomb.ApiError)